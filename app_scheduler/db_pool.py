@@ -4,43 +4,93 @@ Database connection pooling for efficient connection reuse.
 Eliminates the overhead of creating new connections on every cycle.
 """
 
-import asyncpg
+import asyncio
 import os
+from contextlib import asynccontextmanager
+
+import asyncpg
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+__all__ = ["get_pool", "acquire", "close_pool"]
+
 _pool = None
+_pool_lock = None  # Created lazily so it binds to the running event loop
+
+_JSONB_VERSION = b"\x01"  # Leading byte of jsonb's binary wire format
+
+
+def _encode_jsonb(value):
+    """Serialize dicts/lists straight to jsonb bytes with orjson.
+
+    A str is taken as already-serialized JSON, as with asyncpg's default codec.
+    """
+    if isinstance(value, str):
+        return _JSONB_VERSION + value.encode()
+    return _JSONB_VERSION + orjson.dumps(value)
+
+
+def _decode_jsonb(data):
+    """Return jsonb as a JSON string, as asyncpg's default codec does."""
+    return data[1:].decode()
+
+
+async def _init_connection(conn):
+    """Per-connection setup: binary jsonb codec, so dicts skip the str round trip."""
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog", format="binary",
+        encoder=_encode_jsonb, decoder=_decode_jsonb
+    )
+
 
 async def get_pool():
-    """Get or create the global connection pool."""
-    global _pool
-    if _pool is None:
-        _pool = await asyncpg.create_pool(
-            host=os.getenv("PGHOST"),
-            port=int(os.getenv("PGPORT", 5432)),
-            user=os.getenv("PGUSER"),
-            password=os.getenv("PGPASSWORD"),
-            database=os.getenv("PGDATABASE"),
-            min_size=2,
-            max_size=10,
-            command_timeout=60
-        )
+    """Get or create the global connection pool.
+
+    Double-checked under a lock so concurrent first callers share one pool
+    instead of each creating (and leaking) their own.
+    """
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                host=os.getenv("PGHOST"),
+                port=int(os.getenv("PGPORT", 5432)),
+                user=os.getenv("PGUSER"),
+                password=os.getenv("PGPASSWORD"),
+                database=os.getenv("PGDATABASE"),
+                min_size=int(os.getenv("PG_MIN_POOL", 5)),
+                max_size=int(os.getenv("PG_MAX_POOL", 25)),
+                statement_cache_size=1024,
+                # Idle connections (and their prepared statements) outlive the
+                # gaps between scheduler cycles instead of reconnecting each run
+                max_inactive_connection_lifetime=float(os.getenv("PG_MAX_INACTIVE_SEC", 300)),
+                command_timeout=60,
+                init=_init_connection
+            )
     return _pool
 
-async def get_connection():
-    """Get a connection from the pool."""
-    pool = await get_pool()
-    return await pool.acquire()
+@asynccontextmanager
+async def acquire():
+    """Borrow a connection from the pool for the duration of an ``async with`` block.
 
-async def release_connection(conn):
-    """Return a connection to the pool."""
+    Usage:
+        async with acquire() as conn:
+            await conn.fetch(...)
+    """
     pool = await get_pool()
-    await pool.release(conn)
+    async with pool.acquire() as conn:
+        yield conn
 
 async def close_pool():
     """Close the connection pool (for cleanup)."""
-    global _pool
+    global _pool, _pool_lock
     if _pool:
         await _pool.close()
         _pool = None
+    _pool_lock = None
@@ -1,13 +1,15 @@
 import os
-import time
-import json
-import hmac
-import base64
-import hashlib
+import sys
+import orjson
+import asyncio
 import logging
-import requests
-import psycopg2.extras
-from db import get_conn
+import aiohttp
+from db_pool import acquire
+from http_session import get_session
+
+# Share the JWT token cache with get_calls.py instead of minting a token per run
+sys.path.insert(0, '/app/shared_bcfy')
+from token_cache import get_jwt_token
 
 
 # ============================================================
@@ -20,132 +22,111 @@ logging.basicConfig(
 )
 
 
-# ============================================================
-# JWT Builder with detailed diagnostics
-# ============================================================
-def build_jwt():
-    logging.info("🔑 Building Broadcastify JWT token...")
-    api_key = os.getenv("BCFY_API_KEY")
-    api_key_id = os.getenv("BCFY_API_KEY_ID")
-    app_id = os.getenv("BCFY_APP_ID")
-
-    logging.debug(f"API_KEY_ID={api_key_id}, APP_ID={app_id}, API_KEY length={len(api_key) if api_key else 0}")
-
-    if not all([api_key, api_key_id, app_id]):
-        raise RuntimeError("❌ Missing required Broadcastify API credentials")
-
-    header = {"alg": "HS256", "typ": "JWT", "kid": api_key_id}
-    iat = int(time.time())
-    exp = iat + 3600
-    payload = {"iss": app_id, "iat": iat, "exp": exp}
-
-    def b64url(data: bytes) -> str:
-        return base64.urlsafe_b64encode(data).decode().rstrip("=")
-
-    # Use compact JSON format (no spaces) to match Postman/JavaScript encoding
-    header_b64 = b64url(json.dumps(header, separators=(",", ":")).encode())
-    payload_b64 = b64url(json.dumps(payload, separators=(",", ":")).encode())
-    token_data = f"{header_b64}.{payload_b64}"
-
-    logging.debug(f"Header B64: {header_b64}")
-    logging.debug(f"Payload B64: {payload_b64}")
-
-    signature = hmac.new(api_key.encode(), token_data.encode(), hashlib.sha256).digest()
-    signature_b64 = b64url(signature)
-    jwt_token = f"{token_data}.{signature_b64}"
-
-    logging.info(f"✅ JWT built successfully (first 60 chars): {jwt_token[:60]}...")
-    return jwt_token
-
-
 # ============================================================
 # Fetch function with HTTP diagnostics
 # ============================================================
-def fetch_json(endpoint: str, headers: dict):
+async def fetch_json(session, endpoint: str, headers: dict):
     url = f"{os.getenv('BCFY_BASE_URL', 'https://api.bcfy.io')}{endpoint}"
     logging.info(f"🌎 Fetching: {url}")
     try:
-        r = requests.get(url, headers=headers, timeout=15)
-        logging.debug(f"Response status: {r.status_code}")
-        if r.status_code != 200:
-            logging.error(f"❌ Non-200 response from {endpoint}: {r.text}")
-        return r.json()
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as r:
+            logging.debug("Response status: %s", r.status)
+            if r.status != 200:
+                logging.error(f"❌ Non-200 response from {endpoint}: {await r.text()}")
+            return await r.json(content_type=None, loads=orjson.loads)
     except Exception as e:
         logging.exception(f"💥 Request to {endpoint} failed: {e}")
         return {}
 
 
+# ============================================================
+# Staged upsert helpers (COPY → TEMP table → INSERT…SELECT)
+# ============================================================
+COUNTRY_COLUMNS = ["coid", "country_name", "country_code", "iso_alpha2", "raw_json"]
+STATE_COLUMNS = ["stid", "coid", "state_name", "state_code", "raw_json"]
+
+
+async def upsert_countries(conn, countries: list) -> int:
+    """COPY countries into a staging table and merge them with one upsert."""
+    records = [
+        (c["coid"], c["country_name"], c["country_code"], c.get("iso_alpha2"), c)
+        for c in countries
+    ]
+    await conn.execute(
+        "CREATE TEMP TABLE _stage_countries (LIKE bcfy_countries INCLUDING DEFAULTS) ON COMMIT DROP;"
+    )
+    await conn.copy_records_to_table("_stage_countries", records=records, columns=COUNTRY_COLUMNS)
+    await conn.execute("""
+        INSERT INTO bcfy_countries (coid, country_name, country_code, iso_alpha2, raw_json)
+        SELECT coid, country_name, country_code, iso_alpha2, raw_json FROM _stage_countries
+        ON CONFLICT (coid) DO UPDATE SET
+          country_name=EXCLUDED.country_name,
+          country_code=EXCLUDED.country_code,
+          iso_alpha2=EXCLUDED.iso_alpha2,
+          raw_json=EXCLUDED.raw_json,
+          fetched_at=NOW();
+    """)
+    return len(records)
+
+
+async def upsert_states(conn, states: list) -> int:
+    """COPY states into a staging table and merge them with one upsert."""
+    records = [
+        (s["stid"], s["coid"], s["state_name"], s["state_code"], s)
+        for s in states
+    ]
+    await conn.execute(
+        "CREATE TEMP TABLE _stage_states (LIKE bcfy_states INCLUDING DEFAULTS) ON COMMIT DROP;"
+    )
+    await conn.copy_records_to_table("_stage_states", records=records, columns=STATE_COLUMNS)
+    await conn.execute("""
+        INSERT INTO bcfy_states (stid, coid, state_name, state_code, raw_json)
+        SELECT stid, coid, state_name, state_code, raw_json FROM _stage_states
+        ON CONFLICT (stid) DO UPDATE SET
+          state_name=EXCLUDED.state_name,
+          state_code=EXCLUDED.state_code,
+          raw_json=EXCLUDED.raw_json,
+          fetched_at=NOW();
+    """)
+    return len(records)
+
+
 # ============================================================
 # Refresh Common Data
 # ============================================================
-def refresh_common():
+async def refresh_common():
     logging.info("🚀 Starting refresh_common()...")
 
-    jwt_token = build_jwt()
+    jwt_token = get_jwt_token()
     headers = {"Authorization": f"Bearer {jwt_token}"}
 
-    logging.info("📡 Requesting /common/countries ...")
-    countries = fetch_json("/common/countries", headers)
+    logging.info("📡 Requesting /common/countries and /common/states ...")
+    session = await get_session()
+    countries, states = await asyncio.gather(
+        fetch_json(session, "/common/countries", headers),
+        fetch_json(session, "/common/states", headers),
+    )
     logging.info(f"Countries raw keys: {list(countries.keys()) if countries else 'None'}")
-
-    logging.info("📡 Requesting /common/states ...")
-    states = fetch_json("/common/states", headers)
     logging.info(f"States raw keys: {list(states.keys()) if states else 'None'}")
 
+    # Countries and states commit together; a failed fetch must not refresh only one side
+    if not countries or not states:
+        logging.error("❌ Skipping DB refresh: countries or states fetch failed")
+        return
+
     try:
-        with get_conn() as conn:
+        async with acquire() as conn:
             logging.info("💾 Connected to database successfully.")
-            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+            async with conn.transaction():
                 logging.info("📝 Inserting/Updating countries...")
-                for c in countries.get("countries", []):
-                    logging.debug(f"Upserting country: {c}")
-                    cur.execute(
-                        """
-                        INSERT INTO bcfy_countries (coid, country_name, country_code, iso_alpha2, raw_json)
-                        VALUES (%s,%s,%s,%s,%s)
-                        ON CONFLICT (coid) DO UPDATE SET
-                          country_name=EXCLUDED.country_name,
-                          country_code=EXCLUDED.country_code,
-                          iso_alpha2=EXCLUDED.iso_alpha2,
-                          raw_json=EXCLUDED.raw_json,
-                          fetched_at=NOW();
-                        """,
-                        (
-                            c["coid"],
-                            c["country_name"],
-                            c["country_code"],
-                            c.get("iso_alpha2"),
-                            json.dumps(c),
-                        ),
-                    )
+                country_count = await upsert_countries(conn, countries.get("countries", []))
 
                 logging.info("📝 Inserting/Updating states...")
-                for s in states.get("states", []):
-                    logging.debug(f"Upserting state: {s}")
-                    cur.execute(
-                        """
-                        INSERT INTO bcfy_states (stid, coid, state_name, state_code, raw_json)
-                        VALUES (%s,%s,%s,%s,%s)
-                        ON CONFLICT (stid) DO UPDATE SET
-                          state_name=EXCLUDED.state_name,
-                          state_code=EXCLUDED.state_code,
-                          raw_json=EXCLUDED.raw_json,
-                          fetched_at=NOW();
-                        """,
-                        (
-                            s["stid"],
-                            s["coid"],
-                            s["state_name"],
-                            s["state_code"],
-                            json.dumps(s),
-                        ),
-                    )
-
-                conn.commit()
-                logging.info(
-                    f"✅ DB commit complete: {len(countries.get('countries', []))} countries, "
-                    f"{len(states.get('states', []))} states."
-                )
+                state_count = await upsert_states(conn, states.get("states", []))
+
+            logging.info(
+                f"✅ DB commit complete: {country_count} countries, {state_count} states."
+            )
 
     except Exception as e:
         logging.exception(f"❌ Database operation failed: {e}")
@@ -157,7 +138,7 @@ def refresh_common():
 def main():
     logging.info("🟢 get_cache_common_data.py starting main() ...")
     try:
-        refresh_common()
+        asyncio.run(refresh_common())
     except Exception as e:
         logging.exception(f"💥 refresh_common() crashed: {e}")
 
@@ -5,18 +5,24 @@ Pulls new calls, converts each MP3 → optimized 16-kHz WAV,
 uploads to MinIO, and logs ingestion.
 """
 
-import asyncio, aiohttp, asyncpg, os, json, time, boto3, logging, subprocess, sys
+import asyncio, asyncpg, os, io, time, boto3, logging, shutil, sys, tempfile, wave, weakref
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
-from datetime import datetime, timedelta, timezone
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from dotenv import load_dotenv
-import librosa, numpy as np
+import numpy as np
+import orjson
 
 # Import JWT token cache for efficient token reuse
 sys.path.insert(0, '/app/shared_bcfy')
 from token_cache import get_jwt_token
 
-# Import database connection pool
-from db_pool import get_connection, release_connection
+# Import database connection pool and shared HTTP session
+from db_pool import acquire
+from http_session import get_session
 
 # =========================================================
 # Logging
@@ -43,6 +49,9 @@ DB_URL         = f"postgresql://{PGUSER}:{PGPASSWORD}@{PGHOST}:{PGPORT}/{PGDATAB
 BCFY_BASE      = os.getenv("BCFY_BASE_URL", "https://api.bcfy.io")
 CALLS_BASE     = f"{BCFY_BASE}/calls/v1"
 COLLECT_INTERVAL_SEC = int(os.getenv("COLLECT_INTERVAL_SEC", "30"))
+# Adaptive polling: empty polls back off from MIN, doubling up to MAX; any calls reset it
+POLL_BACKOFF_MIN_SEC = int(os.getenv("POLL_BACKOFF_MIN_SEC", "15"))
+POLL_BACKOFF_MAX_SEC = int(os.getenv("POLL_BACKOFF_MAX_SEC", "300"))
 
 MINIO_ENDPOINT       = os.getenv("MINIO_ENDPOINT", "localhost:9000")
 MINIO_ROOT_USER      = os.getenv("MINIO_ROOT_USER", "admin")
@@ -50,30 +59,73 @@ MINIO_ROOT_PASSWORD  = os.getenv("MINIO_ROOT_PASSWORD", "adminadmin")
 MINIO_BUCKET         = os.getenv("MINIO_BUCKET", "feeds")
 MINIO_BUCKET_PATH    = os.getenv("AUDIO_BUCKET_PATH", "calls")
 MINIO_USE_SSL        = os.getenv("MINIO_USE_SSL", "false").lower() == "true"
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "64"))
 
-TEMP_DIR        = os.getenv("TEMP_AUDIO_DIR", "/app/shared_bcfy/tmp")
+DISK_TEMP_DIR   = "/app/shared_bcfy/tmp"
+# Spool temp audio to tmpfs when available; falls back to disk when it runs low
+TEMP_DIR        = os.getenv("TEMP_AUDIO_DIR", "/dev/shm/bcfy_tmp" if os.path.isdir("/dev/shm") else DISK_TEMP_DIR)
+TEMP_MIN_FREE_BYTES = int(os.getenv("TEMP_MIN_FREE_MB", "256")) * 1024 * 1024
 AUDIO_SR        = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
 AUDIO_TARGET_DB = float(os.getenv("AUDIO_TARGET_DB", "-20"))
+# Inputs smaller than this skip the Python analysis pass and go straight to tier 2
+AUDIO_ANALYSIS_MIN_BYTES = int(os.getenv("AUDIO_ANALYSIS_MIN_BYTES", "16384"))
+# Max concurrent FFmpeg conversions (defaults to one per CPU core)
+FFMPEG_CONCURRENCY = int(os.getenv("FFMPEG_CONCURRENCY", str(os.cpu_count() or 1)))
+DOWNLOAD_CHUNK_BYTES = 1 << 16  # aiohttp read size when streaming call audio
+# Max concurrent store_audio() pipelines (download + convert + upload)
+AUDIO_CONCURRENCY = int(os.getenv("AUDIO_CONCURRENCY", "16"))
+
+# Dedicated executors so CPU-bound audio work (analysis, validation) and
+# blocking S3 calls never queue behind each other in the default executor
+_audio_cpu_pool = ThreadPoolExecutor(max_workers=FFMPEG_CONCURRENCY, thread_name_prefix="audio-cpu")
+_s3_pool = ThreadPoolExecutor(max_workers=AUDIO_CONCURRENCY, thread_name_prefix="s3-upload")
 
 os.makedirs(TEMP_DIR, exist_ok=True)
-log.info(f"Temp audio directory: {TEMP_DIR}")
+log.info("Temp audio directory: %s", TEMP_DIR)
 
 # =========================================================
 # MinIO Client
 # =========================================================
-log.info(f"Connecting to MinIO endpoint: {MINIO_ENDPOINT}")
+log.info("Connecting to MinIO endpoint: %s", MINIO_ENDPOINT)
 s3 = boto3.client(
     "s3",
     endpoint_url=f"http{'s' if MINIO_USE_SSL else ''}://{MINIO_ENDPOINT}",
     aws_access_key_id=MINIO_ROOT_USER,
     aws_secret_access_key=MINIO_ROOT_PASSWORD,
-    config=Config(signature_version="s3v4"),
+    config=Config(
+        signature_version="s3v4",
+        # Default pool (10) would serialize AUDIO_CONCURRENCY uploads on connection checkout
+        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        # Adaptive mode rate-limits client-side on 503 SlowDown instead of retry storms
+        retries={'max_attempts': 10, 'mode': 'adaptive'},
+    ),
     region_name="us-east-1",
 )
-try:
-    s3.head_bucket(Bucket=MINIO_BUCKET)
-except Exception:
-    s3.create_bucket(Bucket=MINIO_BUCKET)
+# Single PUT below 8 MiB (typical calls); larger WAVs upload as 8 MiB parts, 8 in parallel
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+_bucket_verified = False  # Bucket check runs on first upload, off the event loop
+
+
+def _create_bucket_if_missing():
+    try:
+        s3.head_bucket(Bucket=MINIO_BUCKET)
+    except Exception:
+        s3.create_bucket(Bucket=MINIO_BUCKET)
+
+
+async def ensure_bucket():
+    """Create the audio bucket once per process without blocking the event loop."""
+    global _bucket_verified
+    if not _bucket_verified:
+        await asyncio.get_running_loop().run_in_executor(_s3_pool, _create_bucket_if_missing)
+        _bucket_verified = True
 
 # =========================================================
 # Database
@@ -82,71 +134,176 @@ async def get_db():
     return await asyncpg.connect(DB_URL)
 
 
+_schema_verified = False  # Set after the first successful check; schema can't regress in-process
+
+
 async def verify_schema():
     """Verify required columns exist before starting ingestion.
 
-    Checks for columns added in migration 005_s3_hierarchical.sql.
+    Checks for columns added in migrations 005_s3_hierarchical.sql and
+    013_playlist_adaptive_polling.sql. Only the first successful call
+    queries the database; later calls return at once.
     Raises RuntimeError if required columns are missing.
     """
-    conn = await get_connection()
-    try:
+    global _schema_verified
+    if _schema_verified:
+        return
+
+    async with acquire() as conn:
         result = await conn.fetch("""
-            SELECT column_name FROM information_schema.columns
-            WHERE table_name = 'bcfy_calls_raw'
-            AND column_name IN ('playlist_uuid', 's3_key_v2')
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE (table_name = 'bcfy_calls_raw' AND column_name IN ('playlist_uuid', 's3_key_v2'))
+               OR (table_name = 'bcfy_playlists' AND column_name IN ('poll_interval_sec', 'next_poll_at'))
         """)
-        columns = [r['column_name'] for r in result]
-
-        missing = []
-        if 'playlist_uuid' not in columns:
-            missing.append('playlist_uuid')
-        if 's3_key_v2' not in columns:
-            missing.append('s3_key_v2')
+        columns = {r['column_name'] for r in result}
 
+        missing = [c for c in ('playlist_uuid', 's3_key_v2') if c not in columns]
         if missing:
             raise RuntimeError(f"Missing required columns: {missing} - run migration 005_s3_hierarchical.sql")
 
-        log.info("Schema verification passed: playlist_uuid and s3_key_v2 columns exist")
-    finally:
-        await release_connection(conn)
+        missing = [c for c in ('poll_interval_sec', 'next_poll_at') if c not in columns]
+        if missing:
+            raise RuntimeError(f"Missing required columns: {missing} - run migration 013_playlist_adaptive_polling.sql")
+
+        _schema_verified = True
+        log.info("Schema verification passed: playlist_uuid, s3_key_v2 and polling columns exist")
+
+
+# =========================================================
+# API Call Metrics (buffered, flushed with COPY)
+# =========================================================
+API_METRICS_COLUMNS = ['timestamp', 'endpoint', 'status_code', 'duration_ms', 'response_size', 'error']
+API_METRICS_FLUSH_ROWS = int(os.getenv("API_METRICS_FLUSH_ROWS", "200"))
+
+_api_metrics_buf = deque()
+_api_metrics_lock = None  # Created lazily so it binds to the running event loop
+
+
+def _record_api_metric(endpoint, status_code, duration_ms, response_size=None, error=None):
+    """Buffer one api_call_metrics row (request time is captured now, not at flush)."""
+    _api_metrics_buf.append(
+        (datetime.now(UTC), endpoint, status_code, duration_ms, response_size, error)
+    )
+
+
+async def flush_api_metrics(conn):
+    """Write all buffered API metrics in a single COPY.
+
+    Flushes are serialized by a lock: concurrent fetches share one ingest
+    connection, which cannot run two COPYs at once. Failures are logged,
+    not raised.
+
+    Returns: number of rows flushed
+    """
+    global _api_metrics_lock
+    if _api_metrics_lock is None:
+        _api_metrics_lock = asyncio.Lock()
+
+    async with _api_metrics_lock:
+        records = []
+        while _api_metrics_buf:
+            records.append(_api_metrics_buf.popleft())
+        if not records:
+            return 0
+
+        try:
+            await conn.copy_records_to_table(
+                'api_call_metrics', records=records, columns=API_METRICS_COLUMNS
+            )
+        except Exception as metrics_err:
+            log.warning("API metrics flush failed (%d rows dropped): %s", len(records), metrics_err)
+        return len(records)
 
 
 # =========================================================
 # HTTP (with API call tracking)
 # =========================================================
+BCFY_API_CONCURRENCY = int(os.getenv("BCFY_API_CONCURRENCY", "8"))  # In-flight API requests
+BCFY_API_MAX_RETRIES = int(os.getenv("BCFY_API_MAX_RETRIES", "3"))  # Retries on 429/503
+RETRY_STATUSES = (429, 503)
+MAX_RETRY_DELAY_SEC = 60
+
+_api_semaphore = None
+
+
+class _ThrottledError(Exception):
+    """The API answered 429/503; carries its Retry-After header, if any."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _get_api_semaphore():
+    """Lazily create the semaphore bounding concurrent Broadcastify API requests."""
+    global _api_semaphore
+    if _api_semaphore is None:
+        _api_semaphore = asyncio.Semaphore(BCFY_API_CONCURRENCY)
+    return _api_semaphore
+
+
+def _retry_delay(attempt, retry_after):
+    """Seconds to wait before retrying a throttled request (numeric Retry-After wins)."""
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = 2 ** attempt
+    return min(delay, MAX_RETRY_DELAY_SEC)
+
+
 async def fetch_json(session, url, token, conn=None, params=None):
-    """Fetch JSON with optional API call tracking and query parameters."""
+    """Fetch JSON with optional API call tracking and query parameters.
+
+    At most BCFY_API_CONCURRENCY requests are in flight at once, however many
+    playlists are polled. HTTP 429/503 responses are retried up to
+    BCFY_API_MAX_RETRIES times with exponential backoff, sleeping outside the
+    semaphore so throttled requests don't hold slots.
+
+    When conn is provided the call is recorded in the metrics buffer, which is
+    flushed through conn once API_METRICS_FLUSH_ROWS rows have accumulated
+    (and at the end of every ingest cycle).
+    """
+    for attempt in range(BCFY_API_MAX_RETRIES + 1):
+        try:
+            async with _get_api_semaphore():
+                return await _fetch_json_once(session, url, token, conn, params)
+        except _ThrottledError as e:
+            if attempt == BCFY_API_MAX_RETRIES:
+                raise
+            delay = _retry_delay(attempt, e.retry_after)
+            log.warning("⏳ %s; retry %d/%d in %.1fs", e, attempt + 1, BCFY_API_MAX_RETRIES, delay)
+            await asyncio.sleep(delay)
+
+
+async def _fetch_json_once(session, url, token, conn, params):
+    """One GET attempt for fetch_json(); raises _ThrottledError on 429/503."""
     start = time.time()
     status_code = 0
     error_msg = None
 
     try:
-        # Debug logging for JWT token
-        log.debug(f"Using JWT token: {token[:50]}...")
-        log.debug(f"Making request to: {url} with params: {params}")
+        # Debug logging for JWT token (lazy: skipped entirely at INFO level)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Using JWT token: %s...", token[:50])
+            log.debug("Making request to: %s with params: %s", url, params)
         async with session.get(url, headers={"Authorization": f"Bearer {token}"}, params=params) as r:
-            text = await r.text()
+            body = await r.read()  # Raw bytes: orjson parses them without a str decode
             status_code = r.status
             duration_ms = int((time.time() - start) * 1000)
 
-            # Log to database if connection provided
+            # Track API call if connection provided
             if conn:
-                try:
-                    await conn.execute("""
-                        INSERT INTO api_call_metrics
-                        (endpoint, status_code, duration_ms, response_size)
-                        VALUES ($1, $2, $3, $4)
-                    """, url, status_code, duration_ms, len(text))
-                except Exception as metrics_err:
-                    log.warning(f"API metrics logging failed: {metrics_err}")
+                _record_api_metric(url, status_code, duration_ms, response_size=len(body))
 
-            log.info(f"HTTP {r.status} ({len(text)} bytes, {duration_ms}ms) → {url}")
+            log.info("HTTP %d (%d bytes, %dms) → %s", r.status, len(body), duration_ms, url)
 
+            if r.status in RETRY_STATUSES:
+                raise _ThrottledError(f"HTTP {r.status}: {url}", r.headers.get("Retry-After"))
             if r.status != 200:
                 raise Exception(f"HTTP {r.status}: {url}")
 
             try:
-                data = json.loads(text)
+                data = orjson.loads(body)
             except Exception as e:
                 raise Exception(f"Bad JSON {url}: {e}")
 
@@ -156,67 +313,42 @@ async def fetch_json(session, url, token, conn=None, params=None):
         duration_ms = int((time.time() - start) * 1000)
         error_msg = str(e)
 
-        # Log failed API call
+        # Track failed API call
         if conn:
-            try:
-                await conn.execute("""
-                    INSERT INTO api_call_metrics
-                    (endpoint, status_code, duration_ms, error)
-                    VALUES ($1, $2, $3, $4)
-                """, url, status_code, duration_ms, error_msg)
-            except Exception as metrics_err:
-                log.warning(f"API metrics logging failed for error case: {metrics_err}")
+            _record_api_metric(url, status_code, duration_ms, error=error_msg)
 
         raise
 
+    finally:
+        if conn and len(_api_metrics_buf) >= API_METRICS_FLUSH_ROWS:
+            await flush_api_metrics(conn)
+
 # =========================================================
 # Audio Analysis + Conversion
 # =========================================================
-def analyze_audio_enhanced(path):
-    """Enhanced audio analysis for adaptive multi-tier processing."""
-    try:
-        y, sr = librosa.load(path, sr=None, mono=True)
-
-        # Existing metrics
-        rms = 20 * np.log10(np.mean(librosa.feature.rms(y=y)) + 1e-9)
-        centroid = librosa.feature.spectral_centroid(y=y, sr=sr).mean()
-        noise_floor = np.percentile(np.abs(y), 10)
-
-        # NEW: Enhanced metrics
-        dynamic_range = np.percentile(np.abs(y), 95) - noise_floor
-        zero_crossing_rate = librosa.feature.zero_crossing_rate(y).mean()
-
-        # NEW: Quality scoring (0-100 scale)
-        snr_estimate = 20 * np.log10(dynamic_range / (noise_floor + 1e-9))
-        quality_score = min(100, max(0, (snr_estimate + 10) * 5))
-
-        return {
-            'quality_score': quality_score,
-            'snr_estimate': snr_estimate,
-            'rms': rms,
-            'spectral_centroid': centroid,
-            'noise_floor': noise_floor,
-            'dynamic_range': dynamic_range,
-            'zero_crossing_rate': zero_crossing_rate
-        }
-    except Exception as e:
-        log.error(f"Audio analysis failed: {e}")
-        # Return default values for unknown quality
-        return {
-            'quality_score': 50,
-            'snr_estimate': 10,
-            'rms': -20,
-            'spectral_centroid': 3000,
-            'noise_floor': 0.002,
-            'dynamic_range': 0.1,
-            'zero_crossing_rate': 0.1
-        }
-
-# Legacy function for backwards compatibility
-def analyze_audio(path):
-    """Legacy function - use analyze_audio_enhanced() instead."""
-    analysis = analyze_audio_enhanced(path)
-    return analysis['rms'], analysis['spectral_centroid'], analysis['noise_floor']
+def analyze_pcm(y, sr):
+    """Tier-selection metrics for decoded float32 mono samples.
+
+    Only the metrics that drive tier selection, computed directly in NumPy
+    (no STFT); both percentiles come from a single pass over |y|.
+    """
+    rms = float(20 * np.log10(np.sqrt(np.mean(y * y)) + 1e-9))
+    noise_floor, p95 = (float(v) for v in np.percentile(np.abs(y), [10, 95]))
+    dynamic_range = p95 - noise_floor
+
+    # Quality scoring (0-100 scale)
+    snr_estimate = 20 * np.log10(dynamic_range / (noise_floor + 1e-9))
+    quality_score = min(100, max(0, (snr_estimate + 10) * 5))
+
+    return {
+        'quality_score': quality_score,
+        'snr_estimate': snr_estimate,
+        'rms': rms,
+        'noise_floor': noise_floor,
+        'dynamic_range': dynamic_range,
+        'duration_sec': len(y) / sr if sr else None
+    }
+
 
 def build_tier1_filters(analysis):
     """Build filter chain for clean audio (quality_score > 70).
@@ -270,202 +402,320 @@ def build_tier3_filters(analysis):
     ]
     return filters
 
-def build_fallback_command(input_path, output_path):
-    """Fallback command if audio analysis fails."""
-    filter_chain = f"loudnorm=I={AUDIO_TARGET_DB}:LRA=11:TP=-1.5,afftdn=nf=-20"
+# Filter chains depend only on env read at startup, so join them once at import.
+# Entries are (tier name, filter count, comma-joined chain).
+TIER1_CHAIN = ",".join(build_tier1_filters(None))
+TIER2_CHAIN = ",".join(build_tier2_filters(None))
+TIER3_CHAIN = ",".join(build_tier3_filters(None))
+FALLBACK_CHAIN = f"loudnorm=I={AUDIO_TARGET_DB}:LRA=11:TP=-1.5,afftdn=nf=-20"
+_TIERS = {
+    1: ("TIER1-CLEAN", TIER1_CHAIN.count(",") + 1, TIER1_CHAIN),
+    2: ("TIER2-MODERATE", TIER2_CHAIN.count(",") + 1, TIER2_CHAIN),
+    3: ("TIER3-POOR", TIER3_CHAIN.count(",") + 1, TIER3_CHAIN),
+}
+
+BASE_ARGV = ("ffmpeg", "-hide_banner", "-loglevel", "warning", "-y")
+_AUDIO_SR_STR = str(AUDIO_SR)
+
+def _decode_command(input_path="pipe:0"):
+    """Build the FFmpeg argv that decodes any input to raw f32le mono PCM at AUDIO_SR on stdout.
+
+    Input is read from stdin unless a (seekable) input_path is given.
+    """
     return [
-        "ffmpeg", "-hide_banner", "-loglevel", "warning", "-y",
+        *BASE_ARGV,
         "-i", input_path,
-        "-ac", "1", "-ar", str(AUDIO_SR), "-c:a", "pcm_s16le",
+        "-ac", "1", "-ar", _AUDIO_SR_STR,
+        "-f", "f32le", "pipe:1"
+    ]
+
+def _pipe_command(filter_chain):
+    """Build the FFmpeg argv that filters decoded f32le PCM (stdin) to s16le PCM (stdout)."""
+    return [
+        *BASE_ARGV,
+        "-f", "f32le", "-ar", _AUDIO_SR_STR, "-ac", "1", "-i", "pipe:0",
+        "-ac", "1", "-ar", _AUDIO_SR_STR, "-c:a", "pcm_s16le",
         "-filter:a", filter_chain,
-        output_path
+        "-f", "s16le", "pipe:1"
     ]
 
-def build_ffmpeg_command(input_path, output_path):
-    """Build adaptive FFmpeg command with quality-based tier selection.
+def select_filter_chain(input_size, analyze):
+    """Pick the tier filter chain for an input of input_size bytes.
+
+    Short inputs (below AUDIO_ANALYSIS_MIN_BYTES) skip the analysis pass and
+    use the tier 2 chain, which suits typical short police transmissions.
+    Otherwise analyze() is called for the quality metrics.
 
-    Returns: (cmd, analysis) tuple for command execution and logging
+    Returns: (filter_chain, analysis) tuple; analysis is None when skipped or failed
     """
     try:
+        if input_size < AUDIO_ANALYSIS_MIN_BYTES:
+            tier, n_filters, chain = _TIERS[2]
+            log.info("🎯 Processing tier: %s (%d filters, analysis skipped)", tier, n_filters)
+            return chain, None
+
         # Analyze audio characteristics
-        analysis = analyze_audio_enhanced(input_path)
+        analysis = analyze()
 
         # Log analysis results
-        log.info(f"📊 Audio analysis: quality={analysis['quality_score']:.0f}/100, "
-                 f"SNR≈{analysis['snr_estimate']:.1f}dB, "
-                 f"RMS={analysis['rms']:.1f}dB, "
-                 f"noise_floor={analysis['noise_floor']:.4f}")
+        log.info("📊 Audio analysis: quality=%.0f/100, SNR≈%.1fdB, RMS=%.1fdB, noise_floor=%.4f",
+                 analysis['quality_score'], analysis['snr_estimate'],
+                 analysis['rms'], analysis['noise_floor'])
 
         # Select processing tier based on quality score
         quality_score = analysis['quality_score']
         if quality_score > 70:
-            tier = "TIER1-CLEAN"
-            filters = build_tier1_filters(analysis)
+            tier, n_filters, chain = _TIERS[1]
         elif quality_score > 40:
-            tier = "TIER2-MODERATE"
-            filters = build_tier2_filters(analysis)
+            tier, n_filters, chain = _TIERS[2]
         else:
-            tier = "TIER3-POOR"
-            filters = build_tier3_filters(analysis)
+            tier, n_filters, chain = _TIERS[3]
+
+        log.info("🎯 Processing tier: %s (%d filters)", tier, n_filters)
+
+        return chain, analysis
+
+    except Exception as e:
+        log.error("❌ Failed to select filter chain: %s", e)
+        # Fallback chain with analysis=None
+        return FALLBACK_CHAIN, None
+
+def validate_pcm_output(pcm, expected_duration_sec=None):
+    """Validate raw mono s16le PCM at AUDIO_SR produced by an FFmpeg pipe.
+
+    Rate and channel count are fixed by the pipe command, so only size,
+    duration and amplitude are checked.
+
+    Returns: (is_valid, message) tuple
+    """
+    try:
+        if len(pcm) < 1000:
+            return False, f"Output too small: {len(pcm)} bytes"
 
-        log.info(f"🎯 Processing tier: {tier} ({len(filters)} filters)")
+        y = np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
 
-        # Build ffmpeg command
-        filter_chain = ",".join(filters)
-        cmd = [
-            "ffmpeg", "-hide_banner", "-loglevel", "warning", "-y",
-            "-i", input_path,
-            "-ac", "1", "-ar", str(AUDIO_SR), "-c:a", "pcm_s16le",
-            "-filter:a", filter_chain,
-            output_path
-        ]
+        mismatch = _check_duration(len(y) / AUDIO_SR, expected_duration_sec)
+        if mismatch:
+            return False, mismatch
 
-        return cmd, analysis
+        return _check_amplitude(y)
 
     except Exception as e:
-        log.error(f"❌ Failed to build FFmpeg command: {e}")
-        # Return fallback command with analysis=None
-        return build_fallback_command(input_path, output_path), None
+        return False, f"Validation error: {str(e)}"
+
 
-def validate_wav_output(wav_path, expected_duration_sec=None):
-    """Validate WAV file quality and integrity.
+def _check_duration(actual_duration, expected_duration_sec):
+    """Return a mismatch message if the duration is outside tolerance, else None."""
+    if expected_duration_sec and expected_duration_sec > 0:
+        duration_diff = abs(actual_duration - expected_duration_sec)
+        tolerance = max(expected_duration_sec * 0.15, 0.5)  # 15% or 0.5s
+        if duration_diff > tolerance:
+            return f"Duration mismatch: {actual_duration:.1f}s vs {expected_duration_sec:.1f}s"
+    return None
 
-    Checks:
-    - File exists and has content
-    - Correct sample rate (16kHz)
-    - Mono channel
-    - Duration within tolerance
-    - Not silent
-    - Not excessively clipped
+
+def _check_amplitude(y):
+    """Reject silent output and warn on excessive clipping.
 
     Returns: (is_valid, message) tuple
     """
+    if y.size == 0:
+        return False, "Output has no samples"
+    abs_y = np.abs(y)  # Computed once for both checks
+
+    # Check for silence
+    max_amplitude = abs_y.max()
+    if max_amplitude < 0.001:
+        return False, f"Output is silent (max amplitude: {max_amplitude:.6f})"
+
+    # Check for excessive clipping
+    clipping_ratio = np.count_nonzero(abs_y > 0.99) / abs_y.size
+    if clipping_ratio > 0.02:  # More than 2% clipped
+        log.warning("⚠️ Output has clipping: %.1f%% of samples", clipping_ratio * 100)
+
+    return True, "Valid"
+
+
+def _is_target_wav(f):
+    """True if f (path or file object) is already 16-bit PCM mono WAV at AUDIO_SR.
+
+    Reads only the RIFF header; anything that isn't a WAV (M4A, MP3) is False.
+    """
     try:
-        # Check file exists and has content
-        if not os.path.exists(wav_path):
-            return False, "Output file not created"
+        with wave.open(f, "rb") as w:
+            return (w.getnchannels() == 1 and w.getsampwidth() == 2
+                    and w.getframerate() == AUDIO_SR and w.getcomptype() == "NONE")
+    except (wave.Error, EOFError):
+        return False
 
-        size_bytes = os.path.getsize(wav_path)
-        if size_bytes < 1000:
-            return False, f"Output too small: {size_bytes} bytes"
 
-        # Load and validate audio properties
-        y, sr = librosa.load(wav_path, sr=None, mono=False)
+_ffmpeg_semaphore = None
 
-        # Check sample rate
-        if sr != AUDIO_SR:
-            return False, f"Wrong sample rate: {sr}Hz (expected {AUDIO_SR}Hz)"
+def _get_ffmpeg_semaphore():
+    """Lazily create the semaphore bounding concurrent conversions (one per core)."""
+    global _ffmpeg_semaphore
+    if _ffmpeg_semaphore is None:
+        _ffmpeg_semaphore = asyncio.Semaphore(FFMPEG_CONCURRENCY)
+    return _ffmpeg_semaphore
 
-        # Check mono
-        if y.ndim > 1:
-            return False, f"Wrong channels: {y.shape[0]} (expected 1)"
 
-        # Check duration if expected is provided
-        if expected_duration_sec and expected_duration_sec > 0:
-            actual_duration = len(y) / sr
-            duration_diff = abs(actual_duration - expected_duration_sec)
-            tolerance = max(expected_duration_sec * 0.15, 0.5)  # 15% or 0.5s
-            if duration_diff > tolerance:
-                return False, f"Duration mismatch: {actual_duration:.1f}s vs {expected_duration_sec:.1f}s"
+def _plan_transcode(pcm_f32, input_size, timeout_sec=None):
+    """Analyze decoded PCM and pick the filter chain and timeout for the filter pass.
 
-        # Check for silence
-        max_amplitude = np.max(np.abs(y))
-        if max_amplitude < 0.001:
-            return False, f"Output is silent (max amplitude: {max_amplitude:.6f})"
+    The decoded length is exact, so it also serves as the expected duration.
 
-        # Check for excessive clipping
-        clipping_ratio = np.sum(np.abs(y) > 0.99) / len(y) if len(y) > 0 else 0
-        if clipping_ratio > 0.02:  # More than 2% clipped
-            log.warning(f"⚠️ Output has clipping: {clipping_ratio*100:.1f}% of samples")
+    Returns: (filter_chain, analysis, expected_duration, timeout_sec) tuple
+    """
+    y = np.frombuffer(pcm_f32, dtype='<f4')
+    expected_duration = len(y) / AUDIO_SR
 
-        return True, "Valid"
+    chain, analysis = select_filter_chain(input_size, lambda: analyze_pcm(y, AUDIO_SR))
 
-    except Exception as e:
-        return False, f"Validation error: {str(e)}"
+    # Calculate timeout (2x duration, minimum 60s)
+    if not timeout_sec:
+        timeout_sec = max(60, expected_duration * 2)
 
+    return chain, analysis, expected_duration, timeout_sec
 
-def convert_to_wav(input_path, timeout_sec=None):
-    """Convert MP3 to WAV with timeout, validation, and enhanced error handling.
 
-    Args:
-        input_path: Path to input MP3 file
-        timeout_sec: Optional timeout in seconds (default: 2x duration or 60s min)
+def _finish_transcode(pcm, analysis, expected_duration, conversion_time_ms):
+    """Validate FFmpeg's PCM output, log the result, and wrap it in a WAV header.
 
-    Returns:
-        Path to converted WAV file (input MP3 is deleted on success)
+    Returns: in-memory WAV file (io.BytesIO, rewound)
 
     Raises:
-        Exception: On conversion failure, validation failure, or timeout
+        Exception: If the output fails validation
     """
-    base = os.path.splitext(input_path)[0]
-    output_path = f"{base}.wav"
-    expected_duration = None
+    is_valid, validation_msg = validate_pcm_output(pcm, expected_duration)
+    if not is_valid:
+        log.error("❌ Validation failed: %s", validation_msg)
+        raise Exception(f"Output validation failed: {validation_msg}")
+
+    wav_file = io.BytesIO()
+    with wave.open(wav_file, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(AUDIO_SR)
+        w.writeframes(pcm)
+    wav_file.seek(0)  # Handed to upload_fileobj as-is; no getvalue() copy
+
+    log.info("✅ Converted successfully (%d bytes, %dms)", wav_file.getbuffer().nbytes, conversion_time_ms)
+
+    # Log analysis and tier info
+    if analysis:
+        log.info("   Quality: %.0f/100, SNR: %.1fdB",
+                 analysis['quality_score'], analysis['snr_estimate'])
+
+    return wav_file
+
 
+async def _run_ffmpeg(cmd, input_bytes, timeout_sec):
+    """Run FFmpeg as an asyncio subprocess, feeding input_bytes on stdin.
+
+    Returns: (returncode, stdout, stderr) tuple
+
+    Raises:
+        Exception: On timeout (the process is killed)
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if input_bytes is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
     try:
-        # Probe input duration for timeout calculation
-        probe_cmd = ['ffprobe', '-v', 'error', '-show_entries',
-                     'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1',
-                     input_path]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=10)
-        expected_duration = float(result.stdout.strip())
-
-        # Calculate timeout (2x duration, minimum 60s)
-        if not timeout_sec:
-            timeout_sec = max(60, expected_duration * 2)
-    except Exception as probe_err:
-        log.warning(f"Could not probe input duration: {probe_err}")
-        timeout_sec = timeout_sec or 60
-        expected_duration = None
-
-    # Build FFmpeg command with analysis
-    cmd, analysis = build_ffmpeg_command(input_path, output_path)
+        stdout, stderr = await asyncio.wait_for(proc.communicate(input_bytes), timeout=timeout_sec)
+    except TimeoutError:
+        proc.kill()
+        await proc.wait()
+        log.error("⏱️  FFmpeg timeout after %ss", timeout_sec)
+        raise Exception(f"Conversion timeout after {timeout_sec}s")
+    return proc.returncode, stdout, stderr
+
 
+def _spool_dir(nbytes):
+    """TEMP_DIR, or DISK_TEMP_DIR if writing nbytes would leave TEMP_DIR under TEMP_MIN_FREE_BYTES."""
     try:
-        # Execute conversion with timeout protection
-        log.info(f"⏱️  Converting with timeout={timeout_sec}s...")
+        if shutil.disk_usage(TEMP_DIR).free - nbytes >= TEMP_MIN_FREE_BYTES:
+            return TEMP_DIR
+    except OSError:
+        pass
+    os.makedirs(DISK_TEMP_DIR, exist_ok=True)
+    return DISK_TEMP_DIR
+
+
+def _ffmpeg_failure(stderr):
+    """Log an FFmpeg failure and build the exception to raise for it."""
+    stderr = stderr.decode(errors="replace")[:500] if stderr else "Unknown error"
+    log.error("❌ FFmpeg failed: %s", stderr)
+    return Exception(f"FFmpeg error: {stderr}")
+
+
+def _write_spool(spool, data):
+    """Write data to an open temp file and flush it so FFmpeg can read it by name."""
+    spool.write(data)
+    spool.flush()
+
+
+async def _decode_pcm(audio_bytes, timeout_sec):
+    """Decode downloaded audio once to raw f32le mono PCM at AUDIO_SR.
+
+    MP4/M4A files whose moov atom follows the media data cannot be demuxed
+    from a pipe; those are retried once from a seekable temp file.
+    """
+    returncode, pcm, stderr = await _run_ffmpeg(_decode_command(), audio_bytes, timeout_sec)
+
+    if returncode != 0:
+        log.warning("⚠️ FFmpeg could not read piped input, retrying from temp file")
+        with tempfile.NamedTemporaryFile(dir=_spool_dir(len(audio_bytes))) as spool:
+            # Written off the loop: the spool falls back to disk when tmpfs is short
+            await asyncio.to_thread(_write_spool, spool, audio_bytes)
+            returncode, pcm, stderr = await _run_ffmpeg(_decode_command(spool.name), None, timeout_sec)
+
+    if returncode != 0:
+        raise _ffmpeg_failure(stderr)
+    return pcm
+
+
+async def transcode_audio_async(audio_bytes, timeout_sec=None):
+    """Convert downloaded audio to optimized WAV entirely in memory.
+
+    FFmpeg decodes the input exactly once, to PCM on stdout. Tier analysis
+    runs on that PCM in NumPy, and a second FFmpeg pass filters the same PCM
+    (raw f32le on stdin, no demux or decode) into s16le. Nothing touches
+    TEMP_DIR except the non-faststart M4A retry. At most FFMPEG_CONCURRENCY
+    conversions run at once. Input that is already 16-bit mono WAV at
+    AUDIO_SR is returned as-is.
+
+    Returns:
+        In-memory WAV file (io.BytesIO, rewound)
+
+    Raises:
+        Exception: On conversion failure, validation failure, or timeout
+    """
+    # Some feeds already deliver the target format; skip both FFmpeg passes
+    if _is_target_wav(io.BytesIO(audio_bytes)):
+        log.info("✅ Input already %dHz mono PCM, skipping conversion", AUDIO_SR)
+        return io.BytesIO(audio_bytes)
+
+    async with _get_ffmpeg_semaphore():
         start_time = time.time()
-        result = subprocess.run(
-            cmd,
-            check=True,
-            timeout=timeout_sec,
-            capture_output=True,
-            text=True
+        pcm_f32 = await _decode_pcm(audio_bytes, timeout_sec or 60)
+
+        loop = asyncio.get_running_loop()
+        chain, analysis, expected_duration, timeout_sec = await loop.run_in_executor(
+            _audio_cpu_pool, _plan_transcode, pcm_f32, len(audio_bytes), timeout_sec
         )
-        conversion_time_ms = int((time.time() - start_time) * 1000)
 
-        # Validate output file
-        is_valid, validation_msg = validate_wav_output(output_path, expected_duration)
-        if not is_valid:
-            log.error(f"❌ Validation failed: {validation_msg}")
-            if os.path.exists(output_path):
-                os.remove(output_path)
-            raise Exception(f"Output validation failed: {validation_msg}")
-
-        # Log success
-        size = os.path.getsize(output_path)
-        log.info(f"✅ Converted successfully → {output_path} ({size:,} bytes, {conversion_time_ms}ms)")
-
-        # Log analysis and tier info
-        if analysis:
-            log.info(f"   Quality: {analysis['quality_score']:.0f}/100, "
-                    f"SNR: {analysis['snr_estimate']:.1f}dB")
-
-        # Delete source only after successful validation
-        os.remove(input_path)
-        return output_path
-
-    except subprocess.TimeoutExpired:
-        log.error(f"⏱️  FFmpeg timeout after {timeout_sec}s on {input_path}")
-        if os.path.exists(output_path):
-            os.remove(output_path)
-        raise Exception(f"Conversion timeout after {timeout_sec}s")
+        log.info("⏱️  Converting with timeout=%ss...", timeout_sec)
+        returncode, pcm, stderr = await _run_ffmpeg(_pipe_command(chain), pcm_f32, timeout_sec)
+        if returncode != 0:
+            raise _ffmpeg_failure(stderr)
 
-    except subprocess.CalledProcessError as e:
-        stderr = e.stderr[:500] if e.stderr else "Unknown error"
-        log.error(f"❌ FFmpeg failed: {stderr}")
-        if os.path.exists(output_path):
-            os.remove(output_path)
-        raise Exception(f"FFmpeg error: {stderr}")
+        conversion_time_ms = int((time.time() - start_time) * 1000)
+        return await loop.run_in_executor(
+            _audio_cpu_pool, _finish_transcode, pcm, analysis, expected_duration, conversion_time_ms
+        )
 
 # =========================================================
 # Audio Storage (Hierarchical S3 Key Structure)
@@ -493,6 +743,16 @@ def _build_hierarchical_s3_key(call_uid, playlist_uuid, started_at):
     )
 
 
+@lru_cache(maxsize=256)
+def _s3_base_metadata(playlist_uuid, feed_id):
+    """S3 metadata shared by every call of a playlist/feed, stringified once."""
+    return {
+        "playlist_id": str(playlist_uuid),
+        "codec": "pcm_s16le",
+        "source_feed": str(feed_id)
+    }
+
+
 def _build_s3_metadata(call_uid, call_metadata):
     """Build S3 user metadata dict for object tagging.
 
@@ -507,32 +767,46 @@ def _build_s3_metadata(call_uid, call_metadata):
     timestamp_utc = started_at.isoformat() + "Z" if started_at else ""
 
     return {
-        "playlist_id": str(call_metadata.get('playlist_uuid', '')),
+        **_s3_base_metadata(call_metadata.get('playlist_uuid', ''), call_metadata.get('feed_id', '')),
         "timestamp_utc": timestamp_utc,
         "call_id": str(call_uid),
         "talkgroup": str(call_metadata.get('tg_id', '')),
-        "duration_ms": str(call_metadata.get('duration_ms', 0)),
-        "codec": "pcm_s16le",
-        "source_feed": str(call_metadata.get('feed_id', ''))
+        "duration_ms": str(call_metadata.get('duration_ms', 0))
     }
 
 
-def _upload_with_metadata(local_path, bucket, s3_key, metadata):
-    """Upload file to S3 with metadata and content type."""
-    s3.upload_file(
-        local_path,
-        bucket,
-        s3_key,
-        ExtraArgs={
-            'Metadata': metadata,
-            'ContentType': 'audio/wav'
-        }
-    )
+def _upload_wav_file(wav_file, bucket, s3_key, metadata=None):
+    """Upload an in-memory WAV file object to S3, with metadata and content type when given.
+
+    Files below the multipart threshold (nearly every call) go out as one
+    put_object on the calling thread; upload_fileobj would hand even those
+    to s3transfer's own worker threads.
+    """
+    extra_args = {'Metadata': metadata, 'ContentType': 'audio/wav'} if metadata else {}
+    if wav_file.getbuffer().nbytes < S3_TRANSFER_CONFIG.multipart_threshold:
+        s3.put_object(Bucket=bucket, Key=s3_key, Body=wav_file, **extra_args)
+    else:
+        s3.upload_fileobj(
+            wav_file, bucket, s3_key, ExtraArgs=extra_args or None, Config=S3_TRANSFER_CONFIG
+        )
+
+
+_audio_semaphore = None
+
+def _get_audio_semaphore():
+    """Lazily create the semaphore bounding concurrent store_audio() pipelines."""
+    global _audio_semaphore
+    if _audio_semaphore is None:
+        _audio_semaphore = asyncio.Semaphore(AUDIO_CONCURRENCY)
+    return _audio_semaphore
 
 
 async def store_audio(session, src_url, call_uid, call_metadata=None):
     """Download, convert, and upload audio with hierarchical S3 key structure.
 
+    Callers may gather any number of these; at most AUDIO_CONCURRENCY run at
+    once, so downloads and uploads overlap without flooding the source or S3.
+
     Args:
         session: aiohttp session for downloading
         src_url: Source URL of audio file (M4A/MP3)
@@ -545,78 +819,87 @@ async def store_audio(session, src_url, call_uid, call_metadata=None):
           - s3_key: Object key for database storage
           - s3_uri: Full S3 URI for logging
     """
-    mp3_path = os.path.join(TEMP_DIR, f"{call_uid}.mp3")
+    async with _get_audio_semaphore():
+        return await _store_audio(session, src_url, call_uid, call_metadata)
+
+
+async def _store_audio(session, src_url, call_uid, call_metadata):
+    """store_audio() body, run while holding the audio semaphore."""
+    # Keep the download in memory; it is piped straight into FFmpeg. Chunks are
+    # appended to one growing buffer instead of joined at the end as r.read()
+    # does, so peak memory stays near the file size.
     async with session.get(src_url) as r:
         if r.status != 200:
             raise Exception(f"Audio {r.status}")
-        with open(mp3_path, "wb") as f:
-            f.write(await r.read())
-
-    try:
-        loop = asyncio.get_running_loop()
-        wav_path = await loop.run_in_executor(None, convert_to_wav, mp3_path)
-
-        # Build S3 key based on whether metadata is available
-        if call_metadata and call_metadata.get('playlist_uuid') and call_metadata.get('started_at'):
-            # New hierarchical structure
-            s3_key = _build_hierarchical_s3_key(
-                call_uid,
-                call_metadata['playlist_uuid'],
-                call_metadata['started_at']
-            )
-            s3_metadata = _build_s3_metadata(call_uid, call_metadata)
-            await loop.run_in_executor(
-                None,
-                _upload_with_metadata,
-                wav_path, MINIO_BUCKET, s3_key, s3_metadata
-            )
-            log.info(f"☁️ Uploaded (hierarchical) → s3://{MINIO_BUCKET}/{s3_key}")
-        else:
-            # Legacy flat structure (backward compatibility)
-            s3_key = f"{MINIO_BUCKET_PATH}/{os.path.basename(wav_path)}"
-            await loop.run_in_executor(None, s3.upload_file, wav_path, MINIO_BUCKET, s3_key)
-            log.info(f"☁️ Uploaded (legacy) → s3://{MINIO_BUCKET}/{s3_key}")
-
-    except RuntimeError:
-        # No running event loop, use blocking calls
-        wav_path = convert_to_wav(mp3_path)
-
-        if call_metadata and call_metadata.get('playlist_uuid') and call_metadata.get('started_at'):
-            s3_key = _build_hierarchical_s3_key(
-                call_uid,
-                call_metadata['playlist_uuid'],
-                call_metadata['started_at']
-            )
-            s3_metadata = _build_s3_metadata(call_uid, call_metadata)
-            _upload_with_metadata(wav_path, MINIO_BUCKET, s3_key, s3_metadata)
-            log.info(f"☁️ Uploaded (hierarchical) → s3://{MINIO_BUCKET}/{s3_key}")
-        else:
-            s3_key = f"{MINIO_BUCKET_PATH}/{os.path.basename(wav_path)}"
-            s3.upload_file(wav_path, MINIO_BUCKET, s3_key)
-            log.info(f"☁️ Uploaded (legacy) → s3://{MINIO_BUCKET}/{s3_key}")
+        audio_bytes = bytearray()
+        async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_BYTES):
+            audio_bytes += chunk
+
+    loop = asyncio.get_running_loop()
+    await ensure_bucket()
+    wav_file = await transcode_audio_async(audio_bytes)
+
+    # Build S3 key based on whether metadata is available
+    if call_metadata and call_metadata.get('playlist_uuid') and call_metadata.get('started_at'):
+        # New hierarchical structure
+        s3_key = _build_hierarchical_s3_key(
+            call_uid,
+            call_metadata['playlist_uuid'],
+            call_metadata['started_at']
+        )
+        s3_metadata = _build_s3_metadata(call_uid, call_metadata)
+        await loop.run_in_executor(
+            _s3_pool, _upload_wav_file, wav_file, MINIO_BUCKET, s3_key, s3_metadata
+        )
+        log.info("☁️ Uploaded (hierarchical) → s3://%s/%s", MINIO_BUCKET, s3_key)
+    else:
+        # Legacy flat structure (backward compatibility)
+        s3_key = f"{MINIO_BUCKET_PATH}/{call_uid}.wav"
+        await loop.run_in_executor(_s3_pool, _upload_wav_file, wav_file, MINIO_BUCKET, s3_key)
+        log.info("☁️ Uploaded (legacy) → s3://%s/%s", MINIO_BUCKET, s3_key)
 
-    os.remove(wav_path)
     s3_uri = f"s3://{MINIO_BUCKET}/{s3_key}"
     return s3_key, s3_uri
 
 # =========================================================
 # Inserts + Poll Logging
 # =========================================================
-async def insert_call(conn, uuid, call, url):
-    cid = f"{call['groupId']}-{call['ts']}"
-    await conn.execute("""
-        INSERT INTO bcfy_calls_raw
-        (call_uid,group_id,ts,node_id,sid,site_id,freq,src,url,
-         started_at,ended_at,duration_ms,fetched_at,raw_json)
-        VALUES($1,$2,$3,$4,$5,$6,$7,$8,$9,TO_TIMESTAMP($10),
-               TO_TIMESTAMP($11),($12*1000),NOW(),$13)
-        ON CONFLICT(call_uid) DO NOTHING;
-    """,
-        cid, call.get("groupId"), call.get("ts"), call.get("nodeId"),
-        call.get("sid"), call.get("siteId"), call.get("freq"),
-        call.get("src"), url, call.get("start_ts"), call.get("end_ts"),
-        call.get("duration", 0), json.dumps(call)
+QUICK_INSERT_SQL = """
+    INSERT INTO bcfy_calls_raw (
+        call_uid, group_id, ts, feed_id, tg_id, tag_id, node_id, sid, site_id,
+        freq, src, url, started_at, ended_at, duration_ms, size_bytes,
+        fetched_at, raw_json, processed, playlist_uuid
+    ) VALUES (
+        $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12,
+        $13, $14, $15, $16, NOW(), $17, FALSE, $18
     )
+    ON CONFLICT(call_uid) DO NOTHING
+    RETURNING call_uid
+"""
+
+# Prepared statements per server connection, keyed by SQL; entries go away with the connection
+_prepared_stmts = weakref.WeakKeyDictionary()
+
+
+async def get_prepared(conn, sql):
+    """Return sql prepared on conn, preparing it on first use.
+
+    Pool connections are proxies that cannot be weakly referenced and change
+    on every acquire(), so statements are memoized on the underlying
+    connection they are actually bound to.
+    """
+    raw_conn = getattr(conn, "_con", None) or conn
+    stmts = _prepared_stmts.setdefault(raw_conn, {})
+    stmt = stmts.get(sql)
+    if stmt is None:
+        stmt = stmts[sql] = await conn.prepare(sql)
+    return stmt
+
+
+async def get_quick_insert_stmt(conn):
+    """Return QUICK_INSERT_SQL prepared on conn."""
+    return await get_prepared(conn, QUICK_INSERT_SQL)
+
 
 async def quick_insert_call_metadata(conn, playlist_uuid, call):
     """Insert call metadata immediately (no audio processing) - for near real-time ingestion.
@@ -629,41 +912,17 @@ async def quick_insert_call_metadata(conn, playlist_uuid, call):
     Returns:
         dict: {'status': 'inserted'|'duplicate'|'error', 'call_uid': str, 'error': str|None}
     """
-    call_uid = f"{call['groupId']}-{call['ts']}"
+    call_uid = f"{call.get('groupId')}-{call.get('ts')}"
 
     try:
+        record = _call_record(playlist_uuid, call)  # Same row the batch path builds
+        call_uid = record[0]
         # Use RETURNING to verify insert success vs ON CONFLICT skip
-        result = await conn.fetchrow("""
-            INSERT INTO bcfy_calls_raw (
-                call_uid, group_id, ts, feed_id, tg_id, tag_id, node_id, sid, site_id,
-                freq, src, url, started_at, ended_at, duration_ms, size_bytes,
-                fetched_at, raw_json, processed, playlist_uuid
-            ) VALUES (
-                $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12,
-                TO_TIMESTAMP($13), TO_TIMESTAMP($14), $15, $16, NOW(), $17, FALSE, $18
-            )
-            ON CONFLICT(call_uid) DO NOTHING
-            RETURNING call_uid
-        """,
-            call_uid,
-            call.get("groupId"),
-            call.get("ts"),
-            call.get("feedId"),
-            call.get("tgId"),
-            call.get("tag"),
-            call.get("nodeId"),
-            call.get("sid"),
-            call.get("siteId"),
-            call.get("freq"),
-            call.get("src"),
-            call.get("url"),  # Original M4A URL from Broadcastify (converted to WAV)
-            call.get("start_ts", call.get("ts")),
-            call.get("end_ts", call.get("ts")),
-            int(call.get("duration", 0) * 1000),
-            call.get("size"),
-            json.dumps(call),
-            playlist_uuid  # Store playlist UUID for hierarchical S3 path construction
-        )
+        stmt = await get_quick_insert_stmt(conn)
+        # Savepoint when called inside the cycle transaction, so one bad row
+        # doesn't abort the inserts that follow it
+        async with conn.transaction():
+            result = await stmt.fetchrow(*record)
 
         if result:
             return {'status': 'inserted', 'call_uid': call_uid, 'error': None}
@@ -671,18 +930,142 @@ async def quick_insert_call_metadata(conn, playlist_uuid, call):
             return {'status': 'duplicate', 'call_uid': call_uid, 'error': None}
 
     except Exception as e:
-        log.error(f"INSERT failed for {call_uid}: {e}")
+        log.error("INSERT failed for %s: %s", call_uid, e)
         return {'status': 'error', 'call_uid': call_uid, 'error': str(e)}
 
-async def poll_start(conn, uuid):
-    await conn.execute("INSERT INTO bcfy_playlist_poll_log(uuid,poll_started_at) VALUES($1,NOW());", uuid)
+# Column order of the rows built by _call_record(), with each column's Postgres type
+CALL_COLUMNS = [
+    'call_uid', 'group_id', 'ts', 'feed_id', 'tg_id', 'tag_id', 'node_id', 'sid', 'site_id',
+    'freq', 'src', 'url', 'started_at', 'ended_at', 'duration_ms', 'size_bytes',
+    'raw_json', 'playlist_uuid'
+]
+CALL_COLUMN_TYPES = [
+    'text', 'text', 'bigint', 'integer', 'bigint', 'integer', 'bigint', 'bigint', 'bigint',
+    'float8', 'bigint', 'text', 'timestamptz', 'timestamptz', 'bigint', 'bigint',
+    'jsonb', 'uuid'
+]
+_CALL_COLUMNS_SQL = ", ".join(CALL_COLUMNS)
+# One typed array parameter per column: the whole batch binds and executes once
+INSERT_CALLS_UNNEST_SQL = f"""
+    INSERT INTO bcfy_calls_raw ({_CALL_COLUMNS_SQL}, fetched_at, processed)
+    SELECT *, NOW(), FALSE FROM unnest({", ".join(f"${i}::{t}[]" for i, t in enumerate(CALL_COLUMN_TYPES, 1))})
+    ON CONFLICT(call_uid) DO NOTHING
+    RETURNING playlist_uuid
+"""
+
+
+def _epoch_to_utc(epoch):
+    """Python-side TO_TIMESTAMP(), so started_at/ended_at bind directly as timestamptz."""
+    return datetime.fromtimestamp(epoch, UTC) if epoch is not None else None
+
+
+def _call_record(playlist_uuid, call):
+    """Build one bcfy_calls_raw row, in CALL_COLUMNS order, from API call metadata.
+
+    Each field is looked up once; call_uid is built from the same groupId/ts.
+    """
+    get = call.get
+    group_id = call['groupId']
+    ts = call['ts']
+    return (
+        f"{group_id}-{ts}",
+        group_id,
+        ts,
+        get("feedId"),
+        get("tgId"),
+        get("tag"),
+        get("nodeId"),
+        get("sid"),
+        get("siteId"),
+        get("freq"),
+        get("src"),
+        get("url"),  # Original M4A URL from Broadcastify (converted to WAV)
+        _epoch_to_utc(get("start_ts", ts)),
+        _epoch_to_utc(get("end_ts", ts)),
+        int(get("duration", 0) * 1000),
+        get("size"),
+        call,
+        playlist_uuid  # Stored for hierarchical S3 path construction
+    )
 
-async def poll_end(conn, uuid, ok, notes):
-    await conn.execute("""
-        UPDATE bcfy_playlist_poll_log
-           SET poll_ended_at=NOW(),success=$2,notes=$3
-         WHERE uuid=$1 AND poll_ended_at IS NULL;
-    """, uuid, ok, notes)
+
+async def insert_calls_batch(conn, batches):
+    """Insert calls from any number of playlists with a single INSERT ... SELECT FROM unnest().
+
+    Rows are transposed into one typed array per column and merged with
+    ON CONFLICT DO NOTHING RETURNING playlist_uuid, so the insert and the
+    per-playlist inserted vs duplicate counts take a single round trip. If
+    the batch is rejected (e.g. one malformed row), falls back to per-call
+    inserts so the valid calls still land.
+
+    Args:
+        conn: Database connection
+        batches: list of (playlist_uuid, calls) pairs
+
+    Returns:
+        dict: playlist_uuid -> {'inserted': int, 'duplicates': int, 'errors': int}
+    """
+    counts = {}
+    staged = Counter()
+    records = []
+    valid_calls = []  # (playlist_uuid, call) pairs that produced a record
+    for playlist_uuid, calls in batches:
+        playlist_counts = counts.setdefault(playlist_uuid, {'inserted': 0, 'duplicates': 0, 'errors': 0})
+        for call in calls:
+            try:
+                records.append(_call_record(playlist_uuid, call))
+                valid_calls.append((playlist_uuid, call))
+                staged[playlist_uuid] += 1
+            except Exception as e:
+                log.error("Skipping malformed call %s-%s: %s", call.get('groupId'), call.get('ts'), e)
+                playlist_counts['errors'] += 1
+
+    if not records:
+        return counts
+
+    # Insert in call_uid order so the unique index takes appends to adjacent
+    # leaf pages instead of scattered page splits
+    records.sort(key=lambda r: r[0])
+
+    try:
+        # Savepoint: a rejected batch must not abort the caller's transaction
+        async with conn.transaction():
+            stmt = await get_prepared(conn, INSERT_CALLS_UNNEST_SQL)
+            inserted_rows = await stmt.fetch(*zip(*records, strict=True))
+        inserted = Counter(r['playlist_uuid'] for r in inserted_rows)
+        for playlist_uuid, n_staged in staged.items():
+            counts[playlist_uuid]['inserted'] = inserted[playlist_uuid]
+            counts[playlist_uuid]['duplicates'] = n_staged - inserted[playlist_uuid]
+        return counts
+
+    except Exception as e:
+        log.error("Batch INSERT of %d calls failed, retrying per call: %s", len(records), e)
+
+    for playlist_uuid, call in valid_calls:
+        result = await quick_insert_call_metadata(conn, playlist_uuid, call)
+        if result['status'] == 'inserted':
+            counts[playlist_uuid]['inserted'] += 1
+        elif result['status'] == 'duplicate':
+            counts[playlist_uuid]['duplicates'] += 1
+        else:
+            counts[playlist_uuid]['errors'] += 1
+    return counts
+
+LOG_POLLS_SQL = """
+    INSERT INTO bcfy_playlist_poll_log(uuid,poll_started_at,poll_ended_at,success,notes)
+    VALUES($1,$2,NOW(),$3,$4);
+"""
+
+async def log_polls(conn, poll_started_at, results):
+    """Write one finished poll log row per playlist in a single round trip.
+
+    results is a list of (uuid, ok, notes); every row shares the cycle's
+    poll_started_at.
+    """
+    stmt = await get_prepared(conn, LOG_POLLS_SQL)
+    await stmt.executemany(
+        [(uuid, poll_started_at, ok, notes) for uuid, ok, notes in results]
+    )
 
 # =========================================================
 # Live Calls Fetching (replaces group-based fetching)
@@ -711,175 +1094,172 @@ async def fetch_live_calls(session, token, conn, playlist_uuid, last_pos=None):
     data = await fetch_json(session, url, token, conn, params=params)
     return data
 
-# =========================================================
-# Playlist Processor
-# =========================================================
-async def process_playlist(session, token, pl):
-    """Process a single playlist with its own database connection.
-
-    Each playlist processor acquires its own connection from the pool to allow
-    true parallel processing without connection conflicts.
-    """
-    uuid, name = pl["uuid"], pl["name"]
-    log.info(f"▶️ Playlist '{name}' ({uuid})")
-
-    # Get last position from database (stores lastPos from previous API response)
-    last_pos = pl.get("last_pos", 0)
-
-    # Acquire own connection from pool for this playlist
-    conn = await get_connection()
-    try:
-        # Wrap poll_start in its own try/except for failure isolation
-        try:
-            await poll_start(conn, uuid)
-        except Exception as e:
-            log.error(f"❌ poll_start failed for '{name}': {e}")
-            return  # Skip this playlist, don't halt others
-
-        try:
-            # Single API call for entire playlist (replaces all group calls + chunking)
-            data = await fetch_live_calls(session, token, conn, uuid, last_pos)
-
-            calls = data.get("calls", [])
-            new_last_pos = data.get("lastPos")  # Unix timestamp from API
-
-            log.info(f"Received {len(calls)} calls (lastPos: {new_last_pos})")
-
-            # Track insert metrics
-            inserted_count = 0
-            duplicate_count = 0
-            error_count = 0
-
-            # Insert metadata for all calls with verification
-            for call in calls:
-                result = await quick_insert_call_metadata(conn, uuid, call)
-                if result['status'] == 'inserted':
-                    inserted_count += 1
-                elif result['status'] == 'duplicate':
-                    duplicate_count += 1
-                else:
-                    error_count += 1
-
-            # Log batch metrics
-            log.info(f"Playlist '{name}': {inserted_count} inserted, "
-                     f"{duplicate_count} duplicates, {error_count} errors")
-
-            # Log to system_logs for observability
-            await conn.execute("""
-                INSERT INTO system_logs (component, event_type, message, metadata)
-                VALUES ($1, $2, $3, $4)
-            """, 'ingestion', 'playlist_batch',
-                 f"Playlist {name}: {inserted_count}/{len(calls)} inserted",
-                 json.dumps({
-                     'playlist_uuid': str(uuid),
-                     'playlist_name': name,
-                     'total_calls': len(calls),
-                     'inserted': inserted_count,
-                     'duplicates': duplicate_count,
-                     'errors': error_count,
-                     'last_pos': new_last_pos
-                 }))
-
-            # Update last_pos for next poll (critical for incremental polling)
-            if new_last_pos:
-                await conn.execute(
-                    "UPDATE bcfy_playlists SET last_pos=$1 WHERE uuid=$2",
-                    new_last_pos,
-                    uuid
-                )
-
-            await poll_end(conn, uuid, True, f"Processed {len(calls)} calls ({inserted_count} new, {duplicate_count} dup), lastPos={new_last_pos}")
-            log.info(f"✅ Finished playlist '{name}'")
-
-        except Exception as e:
-            log.error(f"❌ Playlist '{name}' failed: {e}")
-            # Wrap poll_end in try/except to prevent exception in exception handler
-            try:
-                await poll_end(conn, uuid, False, str(e))
-            except Exception as poll_err:
-                log.error(f"❌ poll_end also failed for '{name}': {poll_err}")
-    finally:
-        await release_connection(conn)
-
 # =========================================================
 # Main Loop
 # =========================================================
-_schema_verified = False  # Module-level flag to ensure schema check runs once
+SYNC_PLAYLISTS_SQL = """
+    SELECT uuid,name,COALESCE(last_pos,0) AS last_pos,poll_interval_sec FROM bcfy_playlists
+     WHERE sync=TRUE AND (next_poll_at IS NULL OR next_poll_at <= NOW());
+"""
+# last_pos only moves forward when the API returned one ($1 NULL keeps it)
+UPDATE_POLL_STATE_SQL = """
+    UPDATE bcfy_playlists
+       SET last_pos=COALESCE($1,last_pos),
+           poll_interval_sec=$2::integer,
+           next_poll_at=NOW() + make_interval(secs => $2::integer)
+     WHERE uuid=$3
+"""
+# Shared by every system_logs write in the cycle, so it is one cached statement
+SYSTEM_LOG_SQL = """
+    INSERT INTO system_logs (component, event_type, message, metadata, duration_ms)
+    VALUES ($1, $2, $3, $4, $5)
+"""
 
-async def ingest_loop():
-    global _schema_verified
+def next_poll_interval(current_sec, call_count):
+    """Backoff for a playlist's next poll: reset on calls, double on an empty poll."""
+    if call_count:
+        return 0
+    return min(max(current_sec * 2, POLL_BACKOFF_MIN_SEC), POLL_BACKOFF_MAX_SEC)
 
-    # One-time schema verification at startup
-    if not _schema_verified:
-        await verify_schema()
-        _schema_verified = True
+async def ingest_loop():
+    # Schema verification (queries only until the first success)
+    await verify_schema()
 
     cycle_start = time.time()
-    conn = await get_connection()  # Get from pool
-
-    try:
-        # Log cycle start
-        await conn.execute("""
-            INSERT INTO system_logs (component, event_type, message)
-            VALUES ($1, $2, $3)
-        """, 'ingestion', 'cycle_start', 'Starting ingestion cycle')
+    async with acquire() as conn:  # Get from pool
+        try:
+            # Log cycle start
+            await conn.execute(
+                SYSTEM_LOG_SQL, 'ingestion', 'cycle_start', 'Starting ingestion cycle', None, None
+            )
 
-        async with aiohttp.ClientSession() as s:
+            s = await get_session()  # Shared keep-alive session, reused across cycles
             token = get_jwt_token()  # Use cached JWT token (1 hour validity, reused)
-            playlists = await conn.fetch(
-                "SELECT uuid,name,COALESCE(last_pos,0) AS last_pos FROM bcfy_playlists WHERE sync=TRUE;"
-            )
+            playlists = await conn.fetch(SYNC_PLAYLISTS_SQL)
             if not playlists:
-                log.warning("No sync=TRUE playlists")
+                log.warning("No sync=TRUE playlists due for polling")
                 return
 
-            log.info(f"{len(playlists)} playlist(s) found.")
+            log.info("%d playlist(s) found.", len(playlists))
 
-            # Get initial call count for metrics
-            initial_count = await conn.fetchval("SELECT COUNT(*) FROM bcfy_calls_raw")
+            poll_started_at = datetime.now(UTC)  # Poll log rows are written once, at the end
 
-            # Process all playlists in parallel with failure isolation
-            # Each playlist acquires its own connection from the pool
-            # return_exceptions=True ensures one playlist failure doesn't halt others
-            results = await asyncio.gather(
-                *[process_playlist(s, token, p) for p in playlists],
+            # Fan out the API fetches (one per playlist); all DB writes below are
+            # batched on this single connection instead of one connection per playlist
+            fetched = await asyncio.gather(
+                *[fetch_live_calls(s, token, conn, p["uuid"], p["last_pos"]) for p in playlists],
                 return_exceptions=True
             )
 
-            # Log any unexpected exceptions that escaped process_playlist's error handling
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    log.error(f"Unexpected exception in playlist {playlists[i]['name']}: {result}")
-
-            # Get final call count for metrics
-            final_count = await conn.fetchval("SELECT COUNT(*) FROM bcfy_calls_raw")
-            calls_processed = final_count - initial_count
-
-        # Log cycle completion with metrics
-        cycle_duration_ms = int((time.time() - cycle_start) * 1000)
-        await conn.execute("""
-            INSERT INTO system_logs (component, event_type, message, metadata, duration_ms)
-            VALUES ($1, $2, $3, $4, $5)
-        """, 'ingestion', 'cycle_complete',
-             f'Processed {calls_processed} calls in {cycle_duration_ms}ms',
-             json.dumps({
-                 'calls_processed': calls_processed,
-                 'playlists_count': len(playlists),
-                 'cycle_duration_ms': cycle_duration_ms
-             }),
-             cycle_duration_ms)
-
-        log.info(f"Cycle done in {cycle_duration_ms}ms ({calls_processed} new calls); sleeping {COLLECT_INTERVAL_SEC}s")
-    finally:
-        await release_connection(conn)  # Return to pool
+            poll_results = []
+            calls_processed = 0  # Rows actually inserted this cycle (from RETURNING)
+            fetched_ok = []  # (playlist, calls, new_last_pos)
+            for pl, data in zip(playlists, fetched, strict=True):
+                if isinstance(data, Exception):
+                    log.error("❌ Playlist '%s' failed: %s", pl['name'], data)
+                    poll_results.append((pl["uuid"], False, str(data)))
+                    continue
+                calls = data.get("calls", [])
+                new_last_pos = data.get("lastPos")  # Unix timestamp from API
+                log.info("▶️ Playlist '%s' (%s): received %d calls (lastPos: %s)",
+                         pl['name'], pl['uuid'], len(calls), new_last_pos)
+                fetched_ok.append((pl, calls, new_last_pos))
+
+            try:
+                # Calls, batch logs and last_pos commit together: a crash can't
+                # advance last_pos past calls that were never stored
+                async with conn.transaction():
+                    # One unnest() insert for every playlist's calls
+                    counts = await insert_calls_batch(
+                        conn, [(pl["uuid"], calls) for pl, calls, _ in fetched_ok]
+                    )
+
+                    batch_logs = []
+                    poll_state_updates = []
+                    for pl, calls, new_last_pos in fetched_ok:
+                        uuid, name = pl["uuid"], pl["name"]
+                        c = counts[uuid]
+                        log.info("Playlist '%s': %d inserted, %d duplicates, %d errors",
+                                 name, c['inserted'], c['duplicates'], c['errors'])
+                        batch_logs.append((
+                            'ingestion', 'playlist_batch',
+                            f"Playlist {name}: {c['inserted']}/{len(calls)} inserted",
+                            {
+                                'playlist_uuid': str(uuid),
+                                'playlist_name': name,
+                                'total_calls': len(calls),
+                                'inserted': c['inserted'],
+                                'duplicates': c['duplicates'],
+                                'errors': c['errors'],
+                                'last_pos': new_last_pos
+                            },
+                            None
+                        ))
+                        # Update last_pos for next poll (critical for incremental polling)
+                        # and back off playlists that came back empty
+                        poll_state_updates.append((
+                            new_last_pos or None,
+                            next_poll_interval(pl["poll_interval_sec"], len(calls)),
+                            uuid
+                        ))
+
+                    # Log to system_logs for observability
+                    if batch_logs:
+                        await conn.executemany(SYSTEM_LOG_SQL, batch_logs)
+                    if poll_state_updates:
+                        await conn.executemany(UPDATE_POLL_STATE_SQL, poll_state_updates)
+
+                calls_processed = sum(c['inserted'] for c in counts.values())
+                for pl, calls, new_last_pos in fetched_ok:
+                    c = counts[pl["uuid"]]
+                    poll_results.append((
+                        pl["uuid"], True,
+                        f"Processed {len(calls)} calls ({c['inserted']} new, {c['duplicates']} dup), lastPos={new_last_pos}"
+                    ))
+                    log.info("✅ Finished playlist '%s'", pl['name'])
+
+            except Exception as e:
+                log.error("❌ Batch write for %d playlist(s) failed: %s", len(fetched_ok), e)
+                poll_results.extend((pl["uuid"], False, str(e)) for pl, _, _ in fetched_ok)
+
+            # Log every poll, even when the batch write failed
+            try:
+                await log_polls(conn, poll_started_at, poll_results)
+            except Exception as poll_err:
+                log.error("❌ Poll log write failed: %s", poll_err)
+
+            # Log cycle completion with metrics
+            cycle_duration_ms = int((time.time() - cycle_start) * 1000)
+            await conn.execute(SYSTEM_LOG_SQL, 'ingestion', 'cycle_complete',
+                 f'Processed {calls_processed} calls in {cycle_duration_ms}ms',
+                 {
+                     'calls_processed': calls_processed,
+                     'playlists_count': len(playlists),
+                     'cycle_duration_ms': cycle_duration_ms
+                 },
+                 cycle_duration_ms)
+
+            log.info("Cycle done in %dms (%d new calls); sleeping %ss",
+                     cycle_duration_ms, calls_processed, COLLECT_INTERVAL_SEC)
+        finally:
+            await flush_api_metrics(conn)  # Write this cycle's buffered API metrics
 
 # =========================================================
 # Entry
 # =========================================================
 if __name__ == "__main__":
+    import uvloop  # libuv-backed event loop; faster sockets and subprocess pipes
+
+    def _new_loop():
+        # Eager tasks run synchronously until their first real await, so
+        # gathered fetches that finish without blocking skip a loop hop
+        loop = uvloop.new_event_loop()
+        loop.set_task_factory(asyncio.eager_task_factory)
+        return loop
+
     try:
-        asyncio.run(ingest_loop())
+        uvloop.run(ingest_loop(), loop_factory=_new_loop)
     except KeyboardInterrupt:
         log.warning("🛑 Stopped manually.")
     except Exception as e:
-        log.exception(f"💥 Fatal: {e}")
+        log.exception("💥 Fatal: %s", e)
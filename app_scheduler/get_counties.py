@@ -1,19 +1,27 @@
 import os
-import json
-import time
-import hmac
-import base64
+import sys
+import asyncio
 import logging
+import aiohttp
+import orjson
 import psycopg2
 import requests
-from hashlib import sha256
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+# Share the JWT token cache with get_calls.py instead of hand-signing a token per script
+sys.path.insert(0, '/app/shared_bcfy')
+from token_cache import get_jwt_token
+
 load_dotenv()
 
 DEFAULT_BASE_URL = os.getenv("BCFY_BASE_URL", "https://api.bcfy.io").rstrip("/")
 COUNTIES_PATH_TEMPLATE = "/common/v1/counties/{}"  # path param: stid
 COUNTY_DETAIL_PATH_TEMPLATE = "/common/v1/county/{}"  # path param: ctid
+COUNTY_DETAIL_CONCURRENCY = int(os.getenv("COUNTY_DETAIL_CONCURRENCY", "10"))  # in-flight detail requests
 
 
 # =========================================================
@@ -27,23 +35,6 @@ def setup_logging(verbose: bool):
     )
 
 
-# =========================================================
-# JWT token builder
-# =========================================================
-def b64url(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode().rstrip("=")
-
-
-def build_jwt(api_key: str, api_key_id: str, app_id: str, ttl: int = 3600) -> str:
-    now = int(time.time())
-    header = {"alg": "HS256", "typ": "JWT", "kid": api_key_id}
-    payload = {"iss": app_id, "iat": now, "exp": now + ttl}
-    header_b64 = b64url(json.dumps(header, separators=(",", ":")).encode())
-    payload_b64 = b64url(json.dumps(payload, separators=(",", ":")).encode())
-    sig = hmac.new(api_key.encode(), f"{header_b64}.{payload_b64}".encode(), sha256).digest()
-    return f"{header_b64}.{payload_b64}.{b64url(sig)}"
-
-
 # =========================================================
 # DB connection
 # =========================================================
@@ -58,28 +49,119 @@ def get_conn():
 
 
 # =========================================================
-# HTTP helper (with persistent session + retries)
+# HTTP session (keep-alive pool, retries on throttling/5xx)
 # =========================================================
-def fetch_json(url: str, headers: dict, retries: int = 3, timeout: int = 15):
-    if not hasattr(fetch_json, "session"):
-        fetch_json.session = requests.Session()
+# One pooled session per run: every request after the first reuses the
+# TCP+TLS connection. Retry honours Retry-After on 429/503.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
 
+
+# =========================================================
+# HTTP helper (pooled session; retries handled by the adapter)
+# =========================================================
+def fetch_json(url: str, headers: dict, timeout: int = 15):
+    resp = SESSION.get(url, headers=headers, timeout=timeout)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+
+# =========================================================
+# Async county detail fetch (one session, bounded concurrency)
+# =========================================================
+RETRY_STATUSES = (429, 503)
+MAX_RETRY_DELAY_SEC = 60
+
+
+def _retry_delay(attempt, retry_after):
+    """Seconds to wait before retrying (numeric Retry-After wins over backoff)."""
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = min(2**attempt, 10)
+    return min(delay, MAX_RETRY_DELAY_SEC)
+
+
+async def fetch_county_detail_async(session, url: str, sem, retries: int = 3):
     for attempt in range(1, retries + 1):
+        retry_after = None
         try:
-            resp = fetch_json.session.get(url, headers=headers, timeout=timeout)
-            resp.raise_for_status()
-            return resp.json()
+            async with sem, session.get(url) as resp:
+                if resp.status in RETRY_STATUSES:
+                    retry_after = resp.headers.get("Retry-After")
+                resp.raise_for_status()
+                return await resp.json(content_type=None, loads=orjson.loads)
         except Exception as e:
-            logging.warning(f"Attempt {attempt}/{retries} failed for {url}: {e}")
-            time.sleep(min(2**attempt, 10))
+            logging.warning("Attempt %s/%s failed for %s: %s", attempt, retries, url, e)
+            if attempt < retries:
+                # Slept outside the semaphore so other counties keep flowing
+                await asyncio.sleep(_retry_delay(attempt, retry_after))
     raise RuntimeError(f"Failed to fetch {url} after {retries} attempts")
 
 
+def new_detail_session(headers: dict, timeout: int = 15):
+    """One keep-alive session for every detail request in the run."""
+    connector = aiohttp.TCPConnector(limit=COUNTY_DETAIL_CONCURRENCY, keepalive_timeout=60)
+    return aiohttp.ClientSession(
+        headers=headers, connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+
+
+async def fetch_county_details(session, sem, base_url: str, ctids: list) -> dict:
+    """Fetch detail for every ctid concurrently; failed fetches map to their exception."""
+    results = await asyncio.gather(
+        *[fetch_county_detail_async(session, f"{base_url}{COUNTY_DETAIL_PATH_TEMPLATE.format(ctid)}", sem)
+          for ctid in ctids],
+        return_exceptions=True,
+    )
+    return dict(zip(ctids, results, strict=True))
+
+
+# =========================================================
+# Row normalization
+# =========================================================
+_EMPTY = (None, "")
+
+
+def _num(v, t):
+    """Coerce an API value with t (int/float); blank or missing becomes NULL."""
+    return t(v) if v not in _EMPTY else None
+
+
+def _to_row(detail: dict, c: dict, ctid, stid, coid, state_name, country_name) -> dict:
+    """Build an upsert_counties() row from a county detail response."""
+    get = detail.get
+    return {
+        "cntid": int(ctid),
+        "stid": int(get("stid", stid)),
+        "coid": int(get("coid", coid)),
+        "county_name": get("county_name"),
+        "county_header": get("county_header"),
+        "type": _num(get("type"), int),
+        "lat": _num(get("lat"), float),
+        "lon": _num(get("lon"), float),
+        "range": _num(get("range"), int),
+        "fips": get("fips"),
+        "timezone_str": get("timezone") or get("timezone_str"),
+        "state_name": get("state_name") or state_name,
+        "state_code": get("state_code"),
+        "country_name": get("country_name") or country_name,
+        "country_code": get("country_code"),
+        "is_active": c.get("is_active", True),
+        "sync": c.get("sync", False),
+        "raw_json": orjson.dumps(detail).decode(),
+    }
+
+
 # =========================================================
 # Upsert / update helpers
 # =========================================================
-def upsert_county(conn, county: dict):
-    """Insert or update a county row in Postgres."""
+def upsert_counties(conn, rows: list):
+    """Insert or update county rows (one multi-row statement per page); caller commits."""
     sql = """
     INSERT INTO bcfy_counties (
         cntid, stid, coid,
@@ -87,12 +169,7 @@ def upsert_county(conn, county: dict):
         fips, timezone_str, state_name, state_code,
         country_name, country_code, is_active, sync, fetched_at, raw_json
     )
-    VALUES (
-        %(cntid)s, %(stid)s, %(coid)s,
-        %(county_name)s, %(county_header)s, %(type)s, %(lat)s, %(lon)s, %(range)s,
-        %(fips)s, %(timezone_str)s, %(state_name)s, %(state_code)s,
-        %(country_name)s, %(country_code)s, %(is_active)s, %(sync)s, NOW(), %(raw_json)s::jsonb
-    )
+    VALUES %s
     ON CONFLICT (cntid) DO UPDATE
       SET county_name   = EXCLUDED.county_name,
           county_header = EXCLUDED.county_header,
@@ -109,12 +186,39 @@ def upsert_county(conn, county: dict):
           is_active     = EXCLUDED.is_active,
           sync          = EXCLUDED.sync,
           raw_json      = EXCLUDED.raw_json,
-          fetched_at    = NOW();
+          fetched_at    = NOW()
+    -- Counties rarely change: skip the tuple rewrite (and its WAL) when nothing differs,
+    -- so fetched_at records the last actual change
+    WHERE (bcfy_counties.county_name, bcfy_counties.county_header, bcfy_counties.type,
+           bcfy_counties.lat, bcfy_counties.lon, bcfy_counties.range, bcfy_counties.fips,
+           bcfy_counties.timezone_str, bcfy_counties.state_name, bcfy_counties.state_code,
+           bcfy_counties.country_name, bcfy_counties.country_code, bcfy_counties.is_active,
+           bcfy_counties.sync, bcfy_counties.raw_json)
+          IS DISTINCT FROM
+          (EXCLUDED.county_name, EXCLUDED.county_header, EXCLUDED.type,
+           EXCLUDED.lat, EXCLUDED.lon, EXCLUDED.range, EXCLUDED.fips,
+           EXCLUDED.timezone_str, EXCLUDED.state_name, EXCLUDED.state_code,
+           EXCLUDED.country_name, EXCLUDED.country_code, EXCLUDED.is_active,
+           EXCLUDED.sync, EXCLUDED.raw_json);
     """
-    cur = conn.cursor()
-    cur.execute(sql, county)
-    conn.commit()
-    cur.close()
+    template = """(
+        %(cntid)s, %(stid)s, %(coid)s,
+        %(county_name)s, %(county_header)s, %(type)s, %(lat)s, %(lon)s, %(range)s,
+        %(fips)s, %(timezone_str)s, %(state_name)s, %(state_code)s,
+        %(country_name)s, %(country_code)s, %(is_active)s, %(sync)s, NOW(), %(raw_json)s::jsonb
+    )"""
+    with conn.cursor() as cur:
+        execute_values(cur, sql, rows, template=template, page_size=500)
+
+
+def write_state(conn, state_name: str, rows: list):
+    """Upsert one state's counties in its own transaction; returns (state_name, count, error)."""
+    try:
+        with conn:  # commits on exit, rolls back on error
+            upsert_counties(conn, rows)
+        return state_name, len(rows), None
+    except Exception as e:
+        return state_name, len(rows), e
 
 
 # =========================================================
@@ -122,14 +226,15 @@ def upsert_county(conn, county: dict):
 # =========================================================
 def main(verbose=False):
     setup_logging(verbose)
+    asyncio.run(sync_counties())
+
+
+async def sync_counties():
     log = logging.getLogger("get_counties")
 
-    api_key = os.getenv("BCFY_API_KEY")
-    api_key_id = os.getenv("BCFY_API_KEY_ID")
-    app_id = os.getenv("BCFY_APP_ID")
     base_url = os.getenv("BCFY_BASE_URL", DEFAULT_BASE_URL)
 
-    jwt = build_jwt(api_key, api_key_id, app_id)
+    jwt = get_jwt_token()
     headers = {"Authorization": f"Bearer {jwt}"}
 
     conn = get_conn()
@@ -146,79 +251,91 @@ def main(verbose=False):
         log.warning("No states found with sync=true.")
         return
 
-    log.info(f"Found {len(states)} states to sync counties for.")
-    total_inserted, total_skipped = 0, 0
-
-    for idx, (stid, state_name, coid, country_name) in enumerate(states, start=1):
-        url = f"{base_url}{COUNTIES_PATH_TEMPLATE.format(stid)}"
-        log.info(f"[{idx}/{len(states)}] Fetching counties list for {state_name}, {country_name} (stid={stid})")
-
-        try:
-            data = fetch_json(url, headers)
-        except Exception as e:
-            log.error(f"Failed to fetch counties for {state_name} ({stid}): {e}")
-            continue
-
-        counties = []
-        if isinstance(data, dict):
-            counties = data.get("counties") or data.get("data") or []
-        elif isinstance(data, list):
-            counties = data
-
-        if not counties:
-            log.info(f"No counties returned for {state_name}")
-            continue
-
-        log.info(f"Retrieved {len(counties)} counties for {state_name}")
-
-        for c in counties:
-            time.sleep(0.1)  # small delay to prevent flooding API
-            ctid = c.get("ctid") or c.get("cntid") or c.get("id")
-            if not ctid:
-                total_skipped += 1
-                log.warning(f"Skipping county (missing ctid): {c}")
-                continue
+    log.info("Found %s states to sync counties for.", len(states))
+    totals = {"inserted": 0, "skipped": 0}
+
+    async def collect(write):
+        state, n, err = await write
+        if err:
+            totals["skipped"] += n
+            log.warning("Failed to upsert %s counties for %s: %s", n, state, err)
+        else:
+            totals["inserted"] += n
+        log.info("Completed %s: %s inserted/updated, %s skipped so far.", state, totals["inserted"], totals["skipped"])
+
+    # Single writer thread: state N's upsert commits while state N+1 is being
+    # fetched. At most one write is in flight, and from here on only the
+    # writer touches conn.
+    loop = asyncio.get_running_loop()
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="county-writer")
+    in_flight = None
+    sem = asyncio.Semaphore(COUNTY_DETAIL_CONCURRENCY)
+    # Counties can show up under more than one state list; upsert each ctid
+    # once per run (ON CONFLICT also rejects duplicates within one statement).
+    # Only successful fetches count, so a failed county is retried under the
+    # next state that lists it.
+    synced = set()
+
+    async with new_detail_session(headers) as session:
+        for idx, (stid, state_name, coid, country_name) in enumerate(states, start=1):
+            url = f"{base_url}{COUNTIES_PATH_TEMPLATE.format(stid)}"
+            log.info("[%s/%s] Fetching counties list for %s, %s (stid=%s)", idx, len(states), state_name, country_name, stid)
 
-            detail_url = f"{base_url}{COUNTY_DETAIL_PATH_TEMPLATE.format(ctid)}"
             try:
-                detail = fetch_json(detail_url, headers)
-                c.update(detail)
+                # List requests stay on the pooled requests SESSION, off the loop
+                data = await asyncio.to_thread(fetch_json, url, headers)
             except Exception as e:
-                log.warning(f"Failed to fetch detail for county {ctid}: {e}")
+                log.error("Failed to fetch counties for %s (%s): %s", state_name, stid, e)
                 continue
 
-            row = {
-                "cntid": int(ctid),
-                "stid": int(detail.get("stid", stid)),
-                "coid": int(detail.get("coid", coid)),
-                "county_name": detail.get("county_name"),
-                "county_header": detail.get("county_header"),
-                "type": int(detail.get("type")) if detail.get("type") not in (None, "") else None,
-                "lat": float(detail.get("lat")) if detail.get("lat") not in (None, "") else None,
-                "lon": float(detail.get("lon")) if detail.get("lon") not in (None, "") else None,
-                "range": int(detail.get("range")) if detail.get("range") not in (None, "") else None,
-                "fips": detail.get("fips"),
-                "timezone_str": detail.get("timezone") or detail.get("timezone_str"),
-                "state_name": detail.get("state_name") or state_name,
-                "state_code": detail.get("state_code"),
-                "country_name": detail.get("country_name") or country_name,
-                "country_code": detail.get("country_code"),
-                "is_active": c.get("is_active", True),
-                "sync": c.get("sync", False),
-                "raw_json": json.dumps(detail, separators=(",", ":")),
-            }
+            counties = []
+            if isinstance(data, dict):
+                counties = data.get("counties") or data.get("data") or []
+            elif isinstance(data, list):
+                counties = data
 
-            try:
-                upsert_county(conn, row)
-                total_inserted += 1
-            except Exception as e:
-                total_skipped += 1
-                log.warning(f"Failed to upsert county {ctid}: {e}")
+            if not counties:
+                log.info("No counties returned for %s", state_name)
+                continue
 
-        log.info(f"Completed {state_name}: {total_inserted} inserted/updated, {total_skipped} skipped so far.")
+            log.info("Retrieved %s counties for %s", len(counties), state_name)
+
+            pending = {}
+            for c in counties:
+                ctid = c.get("ctid") or c.get("cntid") or c.get("id")
+                if not ctid:
+                    totals["skipped"] += 1
+                    log.warning("Skipping county (missing ctid): %s", c)
+                    continue
+                if int(ctid) not in synced:
+                    pending.setdefault(int(ctid), (ctid, c))
+            pending = list(pending.values())
+
+            # Detail requests are pure network wait; fetch the whole state at once
+            details = await fetch_county_details(session, sem, base_url, [ctid for ctid, _ in pending])
+
+            rows = []
+            for ctid, c in pending:
+                detail = details[ctid]
+                if isinstance(detail, Exception):
+                    log.warning("Failed to fetch detail for county %s: %s", ctid, detail)
+                    continue
+                c.update(detail)
+                rows.append(_to_row(detail, c, ctid, stid, coid, state_name, country_name))
+                synced.add(int(ctid))
 
+            if not rows:
+                continue
+            rows.sort(key=lambda r: r["cntid"])  # primary-key order for the btree
+            if in_flight:
+                await collect(in_flight)
+            in_flight = loop.run_in_executor(writer, write_state, conn, state_name, rows)
+
+    if in_flight:
+        await collect(in_flight)
+    writer.shutdown()
     conn.close()
-    log.info(f"All done. Inserted/updated: {total_inserted}, skipped: {total_skipped}.")
+    log.info("All done. Inserted/updated: %s, skipped: %s.", totals["inserted"], totals["skipped"])
 
 
 # =========================================================
@@ -1,15 +1,19 @@
 import os
-import json
-import time
-import hmac
-import base64
+import sys
 import logging
+import orjson
 import argparse
 import psycopg2
 import requests
-from hashlib import sha256
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+# Share the JWT token cache with get_calls.py instead of hand-signing a token per script
+sys.path.insert(0, '/app/shared_bcfy')
+from token_cache import get_jwt_token
+
 # =========================================================
 # CONFIGURATION
 # =========================================================
@@ -29,22 +33,15 @@ def setup_logging(verbose: bool):
     )
 
 # =========================================================
-# JWT TOKEN BUILDER
+# HTTP SESSION (keep-alive pool, retries on throttling/5xx)
 # =========================================================
-def b64url(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode().rstrip("=")
-
-def build_jwt(api_key: str, api_key_id: str, app_id: str, ttl: int = 3600) -> str:
-    now = int(time.time())
-    header = {"alg": "HS256", "typ": "JWT", "kid": api_key_id}
-    payload = {"iss": app_id, "iat": now, "exp": now + ttl}
-
-    header_b64 = b64url(json.dumps(header, separators=(",", ":")).encode())
-    payload_b64 = b64url(json.dumps(payload, separators=(",", ":")).encode())
-
-    msg = f"{header_b64}.{payload_b64}".encode()
-    sig = hmac.new(api_key.encode(), msg, sha256).digest()
-    return f"{header_b64}.{payload_b64}.{b64url(sig)}"
+# Retry honours Retry-After on 429/503
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
 
 # =========================================================
 # DATABASE CONNECTION
@@ -81,23 +78,23 @@ def main():
         "BCFY_APP_ID": app_id
     }.items() if not v]
     if missing:
-        log.error(f"Missing required environment variables: {', '.join(missing)}")
+        log.error("Missing required environment variables: %s", ', '.join(missing))
         return
 
-    # Build JWT
-    jwt = build_jwt(api_key, api_key_id, app_id)
-    log.info("JWT built successfully.")
+    # JWT from the shared token cache
+    jwt = get_jwt_token()
+    log.info("JWT ready.")
 
     url = f"{base_url}{COUNTRIES_PATH}"
     headers = {"Authorization": f"Bearer {jwt}"}
-    log.info(f"Fetching {url}")
+    log.info("Fetching %s", url)
 
     try:
-        r = requests.get(url, headers=headers, timeout=15)
+        r = SESSION.get(url, headers=headers, timeout=15)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
     except Exception as e:
-        log.error(f"API request failed: {e}")
+        log.error("API request failed: %s", e)
         return
 
     if isinstance(data, dict):
@@ -105,44 +102,60 @@ def main():
     elif isinstance(data, list):
         countries = data
     else:
-        log.error(f"Unexpected API format: {type(data)}")
+        log.error("Unexpected API format: %s", type(data))
         return
 
-    log.info(f"Fetched {len(countries)} records.")
+    log.info("Fetched %s records.", len(countries))
 
     # Write to Postgres
     try:
         conn = get_conn()
         cur = conn.cursor()
     except Exception as e:
-        log.error(f"Postgres connection failed: {e}")
+        log.error("Postgres connection failed: %s", e)
         return
 
     sql = """
     INSERT INTO bcfy_countries (coid, country_name, country_code, iso_alpha2, raw_json)
-    VALUES (%s, %s, %s, %s, %s::jsonb)
+    VALUES %s
     ON CONFLICT (coid) DO UPDATE
       SET country_name = EXCLUDED.country_name,
           country_code = EXCLUDED.country_code,
           iso_alpha2 = EXCLUDED.iso_alpha2,
-          raw_json = EXCLUDED.raw_json;
+          raw_json = EXCLUDED.raw_json
+    WHERE (bcfy_countries.country_name, bcfy_countries.country_code,
+           bcfy_countries.iso_alpha2, bcfy_countries.raw_json)
+          IS DISTINCT FROM
+          (EXCLUDED.country_name, EXCLUDED.country_code,
+           EXCLUDED.iso_alpha2, EXCLUDED.raw_json);
     """
 
+    # One row per coid: a repeated key would make the single upsert fail
+    # ("cannot affect row a second time"); the last copy wins as before
+    rows_by_coid = {}
     for c in countries:
         try:
             coid = c.get("coid") or c.get("id")
+            if coid is None:
+                log.warning("Skipping country with missing coid: %s", c)
+                continue
             name = c.get("country_name") or c.get("name")
             code = c.get("country_code") or c.get("code")
             iso = c.get("iso_alpha2") or c.get("isoAlpha2")
-            cur.execute(sql, (coid, name, code, iso, json.dumps(c)))
+            rows_by_coid[str(coid)] = (coid, name, code, iso, orjson.dumps(c).decode())
         except Exception as e:
-            log.warning(f"Failed to insert record {c}: {e}")
+            log.warning("Failed to insert record %s: %s", c, e)
+    rows = list(rows_by_coid.values())
 
-    conn.commit()
+    try:
+        with conn:  # commits on exit, rolls back on error
+            execute_values(cur, sql, rows, template="(%s, %s, %s, %s, %s::jsonb)", page_size=500)
+    except Exception as e:
+        log.error("Failed to upsert %s countries: %s", len(rows), e)
 
     cur.execute("SELECT COUNT(*) FROM bcfy_countries;")
     count = cur.fetchone()[0]
-    log.info(f"Database now has {count} records in bcfy_countries.")
+    log.info("Database now has %s records in bcfy_countries.", count)
     cur.close()
     conn.close()
     log.info("Done.")
@@ -1,14 +1,18 @@
 import os
-import json
-import time
-import hmac
-import base64
+import sys
 import logging
+import orjson
 import psycopg2
 import requests
-from hashlib import sha256
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+# Share the JWT token cache with get_calls.py instead of hand-signing a token per script
+sys.path.insert(0, '/app/shared_bcfy')
+from token_cache import get_jwt_token
+
 # =========================================================
 # Load environment
 # =========================================================
@@ -30,24 +34,6 @@ def setup_logging(verbose: bool):
     )
 
 
-# =========================================================
-# JWT token builder
-# =========================================================
-def b64url(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode().rstrip("=")
-
-
-def build_jwt(api_key: str, api_key_id: str, app_id: str, ttl: int = 3600) -> str:
-    now = int(time.time())
-    header = {"alg": "HS256", "typ": "JWT", "kid": api_key_id}
-    payload = {"iss": app_id, "iat": now, "exp": now + ttl}
-    header_b64 = b64url(json.dumps(header, separators=(",", ":")).encode())
-    payload_b64 = b64url(json.dumps(payload, separators=(",", ":")).encode())
-    sig = hmac.new(api_key.encode(), f"{header_b64}.{payload_b64}".encode(), sha256).digest()
-    token = f"{header_b64}.{payload_b64}.{b64url(sig)}"
-    return token
-
-
 # =========================================================
 # DB connection
 # =========================================================
@@ -62,37 +48,38 @@ def get_conn():
 
 
 # =========================================================
-# HTTP helper with persistent session
+# HTTP session (keep-alive pool, retries on throttling/5xx)
 # =========================================================
-def fetch_json(url: str, headers: dict, retries: int = 3, timeout: int = 15):
-    if not hasattr(fetch_json, "session"):
-        fetch_json.session = requests.Session()
+# One pooled session per run: every request after the first reuses the
+# TCP+TLS connection. Retry honours Retry-After on 429/503.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
 
-    for attempt in range(1, retries + 1):
-        try:
-            resp = fetch_json.session.get(url, headers=headers, timeout=timeout)
-            logging.debug(f"HTTP {resp.status_code} {url}")
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            logging.warning(f"Attempt {attempt}/{retries} failed for {url}: {e}")
-            time.sleep(min(2**attempt, 10))
-    raise RuntimeError(f"Failed to fetch {url} after {retries} attempts")
+
+# =========================================================
+# HTTP helper (pooled session; retries handled by the adapter)
+# =========================================================
+def fetch_json(url: str, headers: dict, timeout: int = 15):
+    resp = SESSION.get(url, headers=headers, timeout=timeout)
+    logging.debug("HTTP %s %s", resp.status_code, url)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
 
 
 # =========================================================
 # Upsert playlists
 # =========================================================
-def upsert_playlist(conn, p: dict):
+def upsert_playlists(conn, rows: list):
     sql = """
     INSERT INTO bcfy_playlists (
         uuid, name, descr, ts, last_seen, listeners, public,
         max_groups, num_groups, ctids, groups_json, fetched_at, raw_json
     )
-    VALUES (
-        %(uuid)s, %(name)s, %(descr)s, %(ts)s, %(last_seen)s, %(listeners)s, %(public)s,
-        %(max_groups)s, %(num_groups)s, %(ctids)s::jsonb, %(groups_json)s::jsonb, NOW(), %(raw_json)s::jsonb
-    )
+    VALUES %s
     ON CONFLICT (uuid) DO UPDATE
       SET name        = EXCLUDED.name,
           descr       = EXCLUDED.descr,
@@ -107,10 +94,12 @@ def upsert_playlist(conn, p: dict):
           raw_json    = EXCLUDED.raw_json,
           fetched_at  = NOW();
     """
-    cur = conn.cursor()
-    cur.execute(sql, p)
-    conn.commit()
-    cur.close()
+    template = """(
+        %(uuid)s, %(name)s, %(descr)s, %(ts)s, %(last_seen)s, %(listeners)s, %(public)s,
+        %(max_groups)s, %(num_groups)s, %(ctids)s::jsonb, %(groups_json)s::jsonb, NOW(), %(raw_json)s::jsonb
+    )"""
+    with conn.cursor() as cur:
+        execute_values(cur, sql, rows, template=template, page_size=500)
 
 
 # =========================================================
@@ -129,78 +118,88 @@ def main(verbose=False):
         log.error("Missing API credentials. Check your .env file.")
         return
 
-    jwt = build_jwt(api_key, api_key_id, app_id)
+    jwt = get_jwt_token()
     headers = {"Authorization": f"Bearer {jwt}"}
 
-    log.info("JWT built successfully.")
-    log.debug(f"JWT (truncated): {jwt[:50]}...")
+    log.info("JWT ready.")
+    log.debug("JWT (truncated): %s...", jwt[:50])
 
     # =========================================================
     # Fetch all public playlists
     # =========================================================
     playlists_url = f"{base_url}{PLAYLISTS_PATH}"
-    log.info(f"Fetching all public playlists from {playlists_url}")
+    log.info("Fetching all public playlists from %s", playlists_url)
 
     try:
         playlists = fetch_json(playlists_url, headers)
     except Exception as e:
-        log.error(f"Failed to fetch playlist list: {e}")
+        log.error("Failed to fetch playlist list: %s", e)
         return
 
     if not playlists:
         log.warning("No public playlists returned.")
         return
 
-    log.info(f"Found {len(playlists)} public playlists.")
+    log.info("Found %s public playlists.", len(playlists))
 
-    conn = get_conn()
-    inserted, skipped = 0, 0
+    rows, skipped = [], 0
+    seen = set()  # A repeated uuid would make the single upsert fail ("cannot affect row a second time")
 
     for idx, summary in enumerate(playlists, start=1):
         uuid = summary.get("uuid")
         name = summary.get("name", "Unknown")
 
         if not uuid:
-            log.warning(f"Skipping playlist with missing UUID: {summary}")
+            log.warning("Skipping playlist with missing UUID: %s", summary)
             skipped += 1
             continue
+        if uuid in seen:
+            log.debug("Skipping repeated playlist %s", uuid)
+            continue
+        seen.add(uuid)
 
         detail_url = f"{base_url}{PLAYLIST_DETAIL_PATH.format(uuid)}"
-        log.info(f"[{idx}/{len(playlists)}] Fetching details for {name} ({uuid})")
+        log.info("[%s/%s] Fetching details for %s (%s)", idx, len(playlists), name, uuid)
 
         try:
             detail = fetch_json(detail_url, headers)
         except Exception as e:
-            log.warning(f"Failed to fetch playlist detail for {uuid}: {e}")
+            log.warning("Failed to fetch playlist detail for %s: %s", uuid, e)
             skipped += 1
             continue
 
+        get = detail.get
+        ts, last_seen, listeners = get("ts"), get("last_seen"), get("listeners")
         row = {
             "uuid": uuid,
-            "name": detail.get("name") or summary.get("name"),
-            "descr": detail.get("descr") or summary.get("descr"),
-            "ts": int(detail.get("ts")) if detail.get("ts") else None,
-            "last_seen": int(detail.get("last_seen")) if detail.get("last_seen") else None,
-            "listeners": int(detail.get("listeners")) if detail.get("listeners") else None,
-            "public": str(detail.get("public")).lower() in ("1", "true", "yes"),
-            "max_groups": detail.get("maxGroups"),
-            "num_groups": detail.get("numGroups"),
-            "ctids": json.dumps(detail.get("ctids") or summary.get("counties") or []),
-            "groups_json": json.dumps(detail.get("groups") or []),
-            "raw_json": json.dumps(detail, separators=(",", ":")),
+            "name": get("name") or summary.get("name"),
+            "descr": get("descr") or summary.get("descr"),
+            "ts": int(ts) if ts else None,
+            "last_seen": int(last_seen) if last_seen else None,
+            "listeners": int(listeners) if listeners else None,
+            "public": str(get("public")).lower() in ("1", "true", "yes"),
+            "max_groups": get("maxGroups"),
+            "num_groups": get("numGroups"),
+            "ctids": orjson.dumps(get("ctids") or summary.get("counties") or []).decode(),
+            "groups_json": orjson.dumps(get("groups") or []).decode(),
+            "raw_json": orjson.dumps(detail).decode(),
         }
+        rows.append(row)
 
+    inserted = 0
+    if rows:
+        conn = get_conn()
         try:
-            upsert_playlist(conn, row)
-            inserted += 1
-            if inserted % 10 == 0:
-                log.info(f"Progress: inserted/updated {inserted} playlists...")
+            with conn:  # single transaction for the whole run
+                upsert_playlists(conn, rows)
+            inserted = len(rows)
         except Exception as e:
-            skipped += 1
-            log.warning(f"Failed to upsert playlist {uuid}: {e}")
+            skipped += len(rows)
+            log.error("Failed to upsert %s playlists: %s", len(rows), e)
+        finally:
+            conn.close()
 
-    conn.close()
-    log.info(f"All done. Inserted/updated: {inserted}, skipped: {skipped}.")
+    log.info("All done. Inserted/updated: %s, skipped: %s.", inserted, skipped)
 
 
 # =========================================================
@@ -1,14 +1,18 @@
 import os
-import json
-import time
-import hmac
-import base64
+import sys
 import logging
+import orjson
 import psycopg2
 import requests
-from hashlib import sha256
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+# Share the JWT token cache with get_calls.py instead of hand-signing a token per script
+sys.path.insert(0, '/app/shared_bcfy')
+from token_cache import get_jwt_token
+
 load_dotenv()
 
 DEFAULT_BASE_URL = os.getenv("BCFY_BASE_URL", "https://api.bcfy.io").rstrip("/")
@@ -25,23 +29,6 @@ def setup_logging(verbose: bool):
     )
 
 
-# =========================================================
-# JWT builder
-# =========================================================
-def b64url(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode().rstrip("=")
-
-
-def build_jwt(api_key: str, api_key_id: str, app_id: str, ttl: int = 3600) -> str:
-    now = int(time.time())
-    header = {"alg": "HS256", "typ": "JWT", "kid": api_key_id}
-    payload = {"iss": app_id, "iat": now, "exp": now + ttl}
-    header_b64 = b64url(json.dumps(header, separators=(",", ":")).encode())
-    payload_b64 = b64url(json.dumps(payload, separators=(",", ":")).encode())
-    sig = hmac.new(api_key.encode(), f"{header_b64}.{payload_b64}".encode(), sha256).digest()
-    return f"{header_b64}.{payload_b64}.{b64url(sig)}"
-
-
 # =========================================================
 # DB connection
 # =========================================================
@@ -56,18 +43,25 @@ def get_conn():
 
 
 # =========================================================
-# HTTP helper
+# HTTP session (keep-alive pool, retries on throttling/5xx)
 # =========================================================
-def fetch_json(url: str, headers: dict, retries: int = 3, timeout: int = 15):
-    for attempt in range(1, retries + 1):
-        try:
-            resp = requests.get(url, headers=headers, timeout=timeout)
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            logging.warning(f"Attempt {attempt}/{retries} failed for {url}: {e}")
-            time.sleep(min(2**attempt, 10))
-    raise RuntimeError(f"Failed to fetch {url} after {retries} attempts")
+# One pooled session per run: every request after the first reuses the
+# TCP+TLS connection. Retry honours Retry-After on 429/503.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
+# =========================================================
+# HTTP helper (pooled session; retries handled by the adapter)
+# =========================================================
+def fetch_json(url: str, headers: dict, timeout: int = 15):
+    resp = SESSION.get(url, headers=headers, timeout=timeout)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
 
 
 # =========================================================
@@ -76,21 +70,35 @@ def fetch_json(url: str, headers: dict, retries: int = 3, timeout: int = 15):
 def upsert_states(conn, coid: int, states: list):
     sql = """
     INSERT INTO bcfy_states (stid, state_name, state_code, coid, raw_json)
-    VALUES (%s, %s, %s, %s, %s::jsonb)
+    VALUES %s
     ON CONFLICT (stid) DO UPDATE
       SET state_name = EXCLUDED.state_name,
           state_code = EXCLUDED.state_code,
           coid       = EXCLUDED.coid,
-          raw_json   = EXCLUDED.raw_json;
+          raw_json   = EXCLUDED.raw_json
+    WHERE (bcfy_states.state_name, bcfy_states.state_code, bcfy_states.coid, bcfy_states.raw_json)
+          IS DISTINCT FROM
+          (EXCLUDED.state_name, EXCLUDED.state_code, EXCLUDED.coid, EXCLUDED.raw_json);
     """
-    cur = conn.cursor()
+    # One row per stid: a repeated key would make the single upsert fail
+    # ("cannot affect row a second time"); the last copy wins as before
+    rows_by_stid = {}
     for s in states:
         stid = s.get("stid") or s.get("id")
-        name = s.get("state_name") or s.get("name")
-        code = s.get("state_code") or s.get("code")
-        cur.execute(sql, (stid, name, code, coid, json.dumps(s)))
-    conn.commit()
-    cur.close()
+        if stid is None:
+            logging.getLogger("get_states").warning("Skipping state with missing stid: %s", s)
+            continue
+        rows_by_stid[str(stid)] = (
+            stid,
+            s.get("state_name") or s.get("name"),
+            s.get("state_code") or s.get("code"),
+            coid,
+            orjson.dumps(s).decode(),
+        )
+    rows = list(rows_by_stid.values())
+    with conn.cursor() as cur:
+        execute_values(cur, sql, rows, template="(%s, %s, %s, %s, %s::jsonb)", page_size=500)
+    return len(rows)
 
 
 # =========================================================
@@ -100,12 +108,9 @@ def main(verbose=False):
     setup_logging(verbose)
     log = logging.getLogger("get_states")
 
-    api_key = os.getenv("BCFY_API_KEY")
-    api_key_id = os.getenv("BCFY_API_KEY_ID")
-    app_id = os.getenv("BCFY_APP_ID")
     base_url = os.getenv("BCFY_BASE_URL", DEFAULT_BASE_URL)
 
-    jwt = build_jwt(api_key, api_key_id, app_id)
+    jwt = get_jwt_token()
     headers = {"Authorization": f"Bearer {jwt}"}
 
     conn = get_conn()
@@ -117,16 +122,16 @@ def main(verbose=False):
         log.warning("No countries with sync=true found.")
         return
 
-    log.info(f"Found {len(countries)} countries to sync states for.")
+    log.info("Found %s countries to sync states for.", len(countries))
 
     for coid, name in countries:
         url = f"{base_url}{STATES_PATH_TEMPLATE.format(coid)}"
-        log.info(f"Fetching states for {name} (coid={coid}) → {url}")
+        log.info("Fetching states for %s (coid=%s) → %s", name, coid, url)
 
         try:
             data = fetch_json(url, headers)
         except Exception as e:
-            log.error(f"Failed to fetch states for {name} (coid={coid}): {e}")
+            log.error("Failed to fetch states for %s (coid=%s): %s", name, coid, e)
             continue
 
         if isinstance(data, dict):
@@ -134,15 +139,16 @@ def main(verbose=False):
         elif isinstance(data, list):
             states = data
         else:
-            log.warning(f"Unexpected response for {name}: {type(data)}")
+            log.warning("Unexpected response for %s: %s", name, type(data))
             continue
 
         if not states:
-            log.info(f"No states returned for {name}")
+            log.info("No states returned for %s", name)
             continue
 
-        upsert_states(conn, coid, states)
-        log.info(f"Inserted/updated {len(states)} states for {name}")
+        with conn:  # one transaction per country: commits on exit, rolls back on error
+            upserted = upsert_states(conn, coid, states)
+        log.info("Inserted/updated %s states for %s", upserted, name)
 
     conn.close()
     log.info("All done.")
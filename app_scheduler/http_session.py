@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Shared aiohttp session for Broadcastify/audio HTTP traffic.
+Keeps TCP/TLS connections alive across ingestion cycles instead of
+opening a new session (and new handshakes) on every run.
+"""
+
+import os
+
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_session = None
+
+async def get_session():
+    """Get or create the global HTTP session."""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=int(os.getenv("HTTP_POOL_LIMIT", 100)),
+            limit_per_host=int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 20)),
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        # Without a default timeout a stalled API or audio request hangs the whole cycle
+        timeout = aiohttp.ClientTimeout(total=int(os.getenv("HTTP_TIMEOUT_SEC", 60)))
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return _session
+
+async def close_session():
+    """Close the HTTP session (for cleanup)."""
+    global _session
+    if _session:
+        await _session.close()
+        _session = None
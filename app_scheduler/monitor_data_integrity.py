@@ -21,13 +21,14 @@ import asyncio
 import json
 import os
 import sys
+import time
 import argparse
 from datetime import datetime, timezone, timedelta
 
 # Add shared modules to path
 sys.path.insert(0, '/app/shared_bcfy')
 
-from db_pool import get_connection, release_connection
+from db_pool import acquire
 
 
 async def check_stuck_calls(conn, hours=1):
@@ -37,10 +38,10 @@ async def check_stuck_calls(conn, hours=1):
         FROM bcfy_calls_raw
         WHERE processed = FALSE
           AND error IS NULL
-          AND fetched_at < NOW() - INTERVAL '%s hours'
+          AND fetched_at < NOW() - make_interval(hours => $1)
         ORDER BY fetched_at ASC
         LIMIT 20
-    """ % hours)
+    """, hours)
 
     return {
         'check': 'stuck_calls',
@@ -93,11 +94,11 @@ async def check_error_patterns(conn, hours=24):
             MAX(last_attempt) as latest
         FROM bcfy_calls_raw
         WHERE error IS NOT NULL
-          AND last_attempt > NOW() - INTERVAL '%s hours'
+          AND last_attempt > NOW() - make_interval(hours => $1)
         GROUP BY SUBSTRING(error FROM 1 FOR 100)
         ORDER BY count DESC
         LIMIT 10
-    """ % hours)
+    """, hours)
 
     total_errors = sum(r['count'] for r in result)
 
@@ -122,8 +123,8 @@ async def check_null_playlist_uuid(conn, hours=24):
     count = await conn.fetchval("""
         SELECT COUNT(*) FROM bcfy_calls_raw
         WHERE playlist_uuid IS NULL
-          AND fetched_at > NOW() - INTERVAL '%s hours'
-    """ % hours)
+          AND fetched_at > NOW() - make_interval(hours => $1)
+    """, hours)
 
     return {
         'check': 'null_playlist_uuid',
@@ -140,11 +141,11 @@ async def get_pipeline_throughput(conn):
         SELECT
             DATE_TRUNC('hour', fetched_at) as hour,
             COUNT(*) as total,
-            SUM(CASE WHEN processed = TRUE THEN 1 ELSE 0 END) as processed,
-            SUM(CASE WHEN error IS NOT NULL THEN 1 ELSE 0 END) as errors
+            COUNT(*) FILTER (WHERE processed) as processed,
+            COUNT(*) FILTER (WHERE error IS NOT NULL) as errors
         FROM bcfy_calls_raw
-        WHERE fetched_at > NOW() - INTERVAL '24 hours'
-        GROUP BY DATE_TRUNC('hour', fetched_at)
+        WHERE fetched_at > NOW() - INTERVAL '24 hours'  -- range scan on bcfy_calls_raw_fetched_at_idx
+        GROUP BY 1
         ORDER BY hour DESC
         LIMIT 24
     """)
@@ -185,10 +186,10 @@ async def get_recent_system_logs(conn, minutes=30):
         SELECT event_type, message, metadata, created_at
         FROM system_logs
         WHERE component = 'ingestion'
-          AND created_at > NOW() - INTERVAL '%s minutes'
+          AND created_at > NOW() - make_interval(mins => $1)
         ORDER BY created_at DESC
         LIMIT 20
-    """ % minutes)
+    """, minutes)
 
     return {
         'check': 'recent_logs',
@@ -205,29 +206,55 @@ async def get_recent_system_logs(conn, minutes=30):
     }
 
 
-async def run_all_checks(output_json=False):
-    """Run all data integrity checks."""
-    conn = await get_connection()
-    try:
+# Independent read-only checks, in report order
+CHECKS = [
+    check_stuck_calls,
+    check_inconsistent_state,
+    check_error_patterns,
+    check_null_playlist_uuid,
+    get_pipeline_throughput,
+    get_recent_system_logs,
+]
+
+
+# Callers within this window share one set of results instead of re-querying
+MONITOR_CACHE_TTL_SEC = float(os.getenv("MONITOR_CACHE_TTL_SEC", "15"))
+
+_cached_at = 0.0
+_cached_results = None
+_cache_lock = None
+
+
+def _get_cache_lock():
+    """Lazily create the lock that single-flights check collection."""
+    global _cache_lock
+    if _cache_lock is None:
+        _cache_lock = asyncio.Lock()
+    return _cache_lock
+
+
+async def _run_check(check):
+    """Run one check on its own pooled connection."""
+    async with acquire() as conn:
+        return await check(conn)
+
+
+async def collect_checks():
+    """Run all checks, or return the last results if younger than MONITOR_CACHE_TTL_SEC.
+
+    Checks run concurrently, one pooled connection each, so a cycle takes
+    about as long as the slowest query; the pool's max_size caps the fan-out.
+    """
+    global _cached_at, _cached_results
+    async with _get_cache_lock():
+        if _cached_results is not None and time.monotonic() - _cached_at < MONITOR_CACHE_TTL_SEC:
+            return _cached_results
+
         results = {
             'timestamp': datetime.now(timezone.utc).isoformat(),
-            'checks': []
+            'checks': list(await asyncio.gather(*(_run_check(check) for check in CHECKS)))
         }
 
-        # Run all checks
-        checks = [
-            ('Stuck Calls', check_stuck_calls(conn)),
-            ('Inconsistent State', check_inconsistent_state(conn)),
-            ('Error Patterns', check_error_patterns(conn)),
-            ('NULL playlist_uuid', check_null_playlist_uuid(conn)),
-            ('Pipeline Throughput', get_pipeline_throughput(conn)),
-            ('Recent Logs', get_recent_system_logs(conn)),
-        ]
-
-        for name, coro in checks:
-            result = await coro
-            results['checks'].append(result)
-
         # Calculate overall severity
         severities = [c.get('severity', 'ok') for c in results['checks']]
         if 'critical' in severities:
@@ -237,15 +264,20 @@ async def run_all_checks(output_json=False):
         else:
             results['overall_severity'] = 'ok'
 
-        if output_json:
-            print(json.dumps(results, indent=2, default=str))
-        else:
-            print_results(results)
-
+        _cached_at, _cached_results = time.monotonic(), results
         return results
 
-    finally:
-        await release_connection(conn)
+
+async def run_all_checks(output_json=False):
+    """Run all data integrity checks and print the report."""
+    results = await collect_checks()
+
+    if output_json:
+        print(json.dumps(results, indent=2, default=str))
+    else:
+        print_results(results)
+
+    return results
 
 
 def print_results(results):
@@ -17,6 +17,7 @@ from get_cache_common_data import refresh_common
 from get_calls import ingest_loop
 from audio_worker import process_pending_audio
 from transcription_dispatcher import dispatch_transcription_tasks
+from http_session import close_session
 
 # -----------------------------------------------------------------
 # Setup
@@ -35,7 +36,7 @@ log = logging.getLogger("scheduler")
 async def job_refresh_common():
     log.info("🚀 Running job_refresh_common() ...")
     try:
-        refresh_common()
+        await refresh_common()
         log.info("✅ refresh_common() completed successfully.")
     except Exception as e:
         log.exception(f"❌ refresh_common() failed: {e}")
@@ -114,7 +115,18 @@ async def main():
             await asyncio.sleep(1)
     except (KeyboardInterrupt, SystemExit):
         log.warning("🛑 Scheduler stopped manually.")
+    finally:
+        await close_session()
 
 # -----------------------------------------------------------------
 if __name__ == "__main__":
-    asyncio.run(main())
+    import uvloop  # libuv-backed event loop for the socket/subprocess-heavy jobs
+
+    def _new_loop():
+        # Eager tasks run synchronously until their first real await, so
+        # gathered fetches/inserts that finish without blocking skip a loop hop
+        loop = uvloop.new_event_loop()
+        loop.set_task_factory(asyncio.eager_task_factory)
+        return loop
+
+    uvloop.run(main(), loop_factory=_new_loop)
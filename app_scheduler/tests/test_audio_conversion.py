@@ -2,42 +2,57 @@
 """
 Test suite for validating audio conversion improvements.
 
-This script tests the enhanced audio processing pipeline by:
-1. Testing audio analysis and quality scoring
-2. Validating tier selection based on quality
-3. Testing FFmpeg command generation
-4. Validating output WAV files
-5. Measuring performance metrics
-6. A/B testing old vs new processing (if both available)
+This script tests the in-memory audio processing pipeline used by ingest by:
+1. Testing audio analysis and quality scoring on decoded PCM
+2. Validating tier selection based on quality (and the short-input skip)
+3. Testing FFmpeg decode/filter command generation
+4. Validating PCM output (size, duration, silence, clipping)
+5. Detecting inputs already in the target WAV format
+6. Testing the decode step, including the M4A temp-file retry
+7. Testing transcode_audio_async end to end with FFmpeg stubbed out
+8. Measuring performance metrics
+
+FFmpeg itself is not run: _run_ffmpeg is swapped for a fake that returns
+canned PCM, so the suite runs anywhere get_calls imports.
 """
 
+import asyncio
+import io
 import os
 import sys
 import json
 import time
 import tempfile
-import subprocess
+import wave
 import numpy as np
-from pathlib import Path
 import logging
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(__file__))
-
-try:
-    import librosa
-except ImportError:
-    print("ERROR: librosa is required. Install with: pip install librosa")
-    sys.exit(1)
-
-from get_calls import (
-    analyze_audio_enhanced,
-    build_ffmpeg_command,
-    convert_to_wav,
-    validate_wav_output,
+# Add app_scheduler and shared modules to path for imports
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _APP_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(_APP_DIR), 'shared_bcfy'))
+
+import get_calls  # noqa: E402
+from get_calls import (  # noqa: E402
+    AUDIO_ANALYSIS_MIN_BYTES,
+    AUDIO_SR,
+    FALLBACK_CHAIN,
+    TIER1_CHAIN,
+    TIER2_CHAIN,
+    TIER3_CHAIN,
+    analyze_pcm,
+    select_filter_chain,
+    validate_pcm_output,
+    transcode_audio_async,
     build_tier1_filters,
     build_tier2_filters,
-    build_tier3_filters
+    build_tier3_filters,
+    _check_amplitude,
+    _check_duration,
+    _decode_command,
+    _decode_pcm,
+    _is_target_wav,
+    _pipe_command,
 )
 
 # Logging setup
@@ -56,7 +71,7 @@ TEST_RESULTS = {
 
 
 def assert_true(condition, test_name, error_msg=""):
-    """Helper function for assertions."""
+    """Helper function for assertions; records the result and raises on failure."""
     global TEST_RESULTS
     if condition:
         TEST_RESULTS['tests_passed'] += 1
@@ -70,64 +85,133 @@ def assert_true(condition, test_name, error_msg=""):
             'status': 'FAILED',
             'error': error_msg
         })
-        return False
+        raise AssertionError(f"{test_name}: {error_msg}")
+
+
+def sine(duration, amplitude=0.5, frequency=1000, noise=0.0):
+    """float32 mono test tone at AUDIO_SR, optionally with white noise."""
+    t = np.arange(int(AUDIO_SR * duration)) / AUDIO_SR
+    y = amplitude * np.sin(2 * np.pi * frequency * t)
+    if noise:
+        y = y + noise * np.random.randn(len(t))
+    return np.clip(y, -1, 1).astype(np.float32)
+
+
+def to_s16le(y):
+    """Raw s16le PCM bytes, as the FFmpeg filter pass writes them."""
+    return (np.clip(y, -1, 1) * 32767).astype('<i2').tobytes()
+
+
+def to_f32le(y):
+    """Raw f32le PCM bytes, as the FFmpeg decode pass writes them."""
+    return y.astype('<f4').tobytes()
+
+
+def wav_bytes(y, sr=AUDIO_SR, channels=1):
+    """16-bit PCM WAV file contents for y (duplicated across channels)."""
+    pcm = np.repeat(np.clip(y, -1, 1) * 32767, channels).astype('<i2').tobytes()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+class FakeFFmpeg:
+    """Stand-in for get_calls._run_ffmpeg that records every invocation.
+
+    Decode commands (f32le on stdout) return decoded_pcm; filter commands
+    (-filter:a) return filtered_pcm. A pipe decode (input on stdin) fails
+    with pipe_decode_error when one is set, as FFmpeg does for non-faststart
+    M4A. spooled collects what a file-based decode found on disk.
+    """
+
+    def __init__(self, decoded_pcm=b"", filtered_pcm=b"", pipe_decode_error=None,
+                 file_decode_error=None, filter_error=None):
+        self.decoded_pcm = decoded_pcm
+        self.filtered_pcm = filtered_pcm
+        self.pipe_decode_error = pipe_decode_error
+        self.file_decode_error = file_decode_error
+        self.filter_error = filter_error
+        self.calls = []
+        self.spooled = []
+
+    async def __call__(self, cmd, input_bytes, timeout_sec):
+        self.calls.append((cmd, input_bytes, timeout_sec))
+        if '-filter:a' in cmd:
+            if self.filter_error:
+                return 1, b"", self.filter_error
+            return 0, self.filtered_pcm, b""
+        source = cmd[cmd.index('-i') + 1]
+        if source == 'pipe:0':
+            if self.pipe_decode_error:
+                return 1, b"", self.pipe_decode_error
+            return 0, self.decoded_pcm, b""
+        with open(source, 'rb') as f:
+            self.spooled.append(f.read())
+        if self.file_decode_error:
+            return 1, b"", self.file_decode_error
+        return 0, self.decoded_pcm, b""
+
+
+def run_with_ffmpeg(fake, coro_fn):
+    """Run coro_fn() with _run_ffmpeg replaced by fake and temp files in a scratch dir."""
+    saved = (get_calls._run_ffmpeg, get_calls._ffmpeg_semaphore,
+             get_calls.TEMP_DIR, get_calls.TEMP_MIN_FREE_BYTES)
+    with tempfile.TemporaryDirectory() as scratch:
+        get_calls._run_ffmpeg = fake
+        get_calls._ffmpeg_semaphore = None  # Bind a fresh semaphore to this event loop
+        get_calls.TEMP_DIR = scratch
+        get_calls.TEMP_MIN_FREE_BYTES = 0
+        try:
+            return asyncio.run(coro_fn())
+        finally:
+            (get_calls._run_ffmpeg, get_calls._ffmpeg_semaphore,
+             get_calls.TEMP_DIR, get_calls.TEMP_MIN_FREE_BYTES) = saved
 
 
 def test_audio_analysis():
-    """Test enhanced audio analysis function."""
+    """Test audio analysis on decoded PCM."""
     log.info("\n" + "="*60)
     log.info("TEST SUITE: Audio Analysis")
     log.info("="*60)
 
-    # Create a test sine wave audio file (1 second, 16kHz)
-    sr = 16000
-    duration = 1.0
-    frequency = 1000  # 1 kHz sine wave
-
-    # Create clean audio
-    t = np.linspace(0, duration, int(sr * duration))
-    clean_audio = 0.5 * np.sin(2 * np.pi * frequency * t)
-
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-        clean_path = f.name
+    # 1 kHz sine wave, 1 second at AUDIO_SR
+    analysis = analyze_pcm(sine(1.0), AUDIO_SR)
 
-    try:
-        # Write test audio to WAV
-        import soundfile as sf
-        sf.write(clean_path, clean_audio, sr)
-
-        # Test analysis
-        analysis = analyze_audio_enhanced(clean_path)
-
-        # Validate analysis output
-        assert_true(
-            'quality_score' in analysis,
-            "Audio analysis includes quality_score",
-            f"Missing quality_score in {analysis.keys()}"
-        )
+    assert_true(
+        'quality_score' in analysis,
+        "Audio analysis includes quality_score",
+        f"Missing quality_score in {analysis.keys()}"
+    )
 
-        assert_true(
-            0 <= analysis['quality_score'] <= 100,
-            "Quality score is in valid range (0-100)",
-            f"Quality score {analysis['quality_score']} out of range"
-        )
+    assert_true(
+        0 <= analysis['quality_score'] <= 100,
+        "Quality score is in valid range (0-100)",
+        f"Quality score {analysis['quality_score']} out of range"
+    )
 
-        assert_true(
-            'snr_estimate' in analysis,
-            "Audio analysis includes SNR estimate",
-            f"Missing snr_estimate in {analysis.keys()}"
-        )
+    assert_true(
+        'snr_estimate' in analysis,
+        "Audio analysis includes SNR estimate",
+        f"Missing snr_estimate in {analysis.keys()}"
+    )
 
-        assert_true(
-            'rms' in analysis and isinstance(analysis['rms'], (int, float)),
-            "RMS value is numeric",
-            f"Invalid RMS: {analysis.get('rms')}"
-        )
+    assert_true(
+        'rms' in analysis and isinstance(analysis['rms'], (int, float)),
+        "RMS value is numeric",
+        f"Invalid RMS: {analysis.get('rms')}"
+    )
 
-        log.info(f"  Analysis results: {json.dumps({k: v for k, v in analysis.items() if isinstance(v, (int, float))}, indent=2)}")
+    assert_true(
+        abs(analysis['duration_sec'] - 1.0) < 1e-6,
+        "Duration comes from the decoded sample count",
+        f"Got duration {analysis['duration_sec']}"
+    )
 
-    finally:
-        os.unlink(clean_path)
+    log.info(f"  Analysis results: {json.dumps({k: float(v) for k, v in analysis.items() if isinstance(v, (int, float))}, indent=2)}")
 
 
 def test_tier_selection():
@@ -136,15 +220,10 @@ def test_tier_selection():
     log.info("TEST SUITE: Tier Selection")
     log.info("="*60)
 
-    # Create mock analysis results for different quality levels
-    clean_analysis = {'quality_score': 80, 'snr_estimate': 20, 'rms': -15}
-    moderate_analysis = {'quality_score': 55, 'snr_estimate': 12, 'rms': -20}
-    poor_analysis = {'quality_score': 25, 'snr_estimate': 5, 'rms': -28}
-
-    # Test tier selection
-    tier1_filters = build_tier1_filters(clean_analysis)
-    tier2_filters = build_tier2_filters(moderate_analysis)
-    tier3_filters = build_tier3_filters(poor_analysis)
+    # Test tier filter builders
+    tier1_filters = build_tier1_filters(None)
+    tier2_filters = build_tier2_filters(None)
+    tier3_filters = build_tier3_filters(None)
 
     assert_true(
         len(tier1_filters) > 0,
@@ -165,21 +244,47 @@ def test_tier_selection():
     )
 
     assert_true(
-        'speechnorm' in ','.join(tier2_filters),
-        "Tier 2 includes speechnorm filter",
-        f"Filters: {tier2_filters}"
+        'afwtdn' in TIER2_CHAIN and 'speechnorm' in TIER2_CHAIN,
+        "Tier 2 includes wavelet denoising and speechnorm",
+        f"Chain: {TIER2_CHAIN}"
     )
 
     assert_true(
-        'afwtdn' in ','.join(tier2_filters),
-        "Tier 2 includes wavelet denoising",
-        f"Filters: {tier2_filters}"
+        'anlmdn' in TIER3_CHAIN,
+        "Tier 3 includes non-local means denoising",
+        f"Chain: {TIER3_CHAIN}"
     )
 
+    # Quality score picks the chain
+    large = AUDIO_ANALYSIS_MIN_BYTES
+    for score, expected, name in ((80, TIER1_CHAIN, "Tier 1"), (55, TIER2_CHAIN, "Tier 2"),
+                                  (25, TIER3_CHAIN, "Tier 3")):
+        analysis = {'quality_score': score, 'snr_estimate': 10, 'rms': -20, 'noise_floor': 0.01}
+        chain, returned = select_filter_chain(large, lambda a=analysis: a)
+        assert_true(
+            chain == expected and returned is analysis,
+            f"Quality {score} selects {name}",
+            f"Got chain {chain!r}"
+        )
+
+    # Inputs under AUDIO_ANALYSIS_MIN_BYTES skip analysis and use tier 2
+    analyzed = []
+    chain, analysis = select_filter_chain(large - 1, lambda: analyzed.append(1))
     assert_true(
-        'anlmdn' in ','.join(tier3_filters),
-        "Tier 3 includes non-local means denoising",
-        f"Filters: {tier3_filters}"
+        chain == TIER2_CHAIN and analysis is None and not analyzed,
+        f"Inputs under {AUDIO_ANALYSIS_MIN_BYTES} bytes skip analysis (tier 2)",
+        f"Chain: {chain!r}, analysis: {analysis}, analyze calls: {len(analyzed)}"
+    )
+
+    # A failing analysis falls back to the fallback chain
+    def broken():
+        raise ValueError("bad samples")
+
+    chain, analysis = select_filter_chain(large, broken)
+    assert_true(
+        chain == FALLBACK_CHAIN and analysis is None,
+        "Analysis failure selects the fallback chain",
+        f"Chain: {chain!r}"
     )
 
     log.info(f"  Tier 1 filters: {len(tier1_filters)}")
@@ -188,109 +293,265 @@ def test_tier_selection():
 
 
 def test_ffmpeg_command_building():
-    """Test FFmpeg command generation."""
+    """Test FFmpeg decode and filter command generation."""
     log.info("\n" + "="*60)
     log.info("TEST SUITE: FFmpeg Command Building")
     log.info("="*60)
 
-    # Create a test WAV file
-    sr = 16000
+    decode_cmd = _decode_command()
+    assert_true(
+        decode_cmd[0] == 'ffmpeg' and decode_cmd[decode_cmd.index('-i') + 1] == 'pipe:0',
+        "Decode command reads from stdin by default",
+        f"Command: {decode_cmd}"
+    )
+
+    assert_true(
+        decode_cmd[-3:] == ['-f', 'f32le', 'pipe:1'] and str(AUDIO_SR) in decode_cmd,
+        "Decode command writes f32le PCM at AUDIO_SR to stdout",
+        f"Command: {decode_cmd}"
+    )
+
+    file_cmd = _decode_command('/tmp/call.m4a')
+    assert_true(
+        file_cmd[file_cmd.index('-i') + 1] == '/tmp/call.m4a',
+        "Decode command can read a seekable file instead",
+        f"Command: {file_cmd}"
+    )
+
+    pipe_cmd = _pipe_command(TIER2_CHAIN)
+    assert_true(
+        pipe_cmd[pipe_cmd.index('-filter:a') + 1] == TIER2_CHAIN,
+        "Filter command applies the selected chain",
+        f"Command: {pipe_cmd}"
+    )
+
+    assert_true(
+        pipe_cmd[pipe_cmd.index('-i') - 1] == '1' and '-c:a' in pipe_cmd
+        and pipe_cmd[-3:] == ['-f', 's16le', 'pipe:1'],
+        "Filter command reads f32le PCM and writes s16le PCM",
+        f"Command: {pipe_cmd}"
+    )
+
+    log.info(f"  Generated command: {' '.join(pipe_cmd[:5])}...")
+    log.info(f"  Filter chain includes {len(TIER2_CHAIN.split(','))} filters")
+
+
+def test_output_validation():
+    """Test PCM output validation."""
+    log.info("\n" + "="*60)
+    log.info("TEST SUITE: Output Validation")
+    log.info("="*60)
+
     duration = 1.0
-    t = np.linspace(0, duration, int(sr * duration))
-    audio = 0.5 * np.sin(2 * np.pi * 1000 * t)
+    pcm = to_s16le(sine(duration))
 
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-        input_path = f.name
-        output_path = input_path.replace('.wav', '_out.wav')
+    is_valid, msg = validate_pcm_output(pcm, expected_duration_sec=duration)
+    assert_true(
+        is_valid,
+        "Valid PCM passes validation",
+        f"Validation failed: {msg}"
+    )
 
-    try:
-        import soundfile as sf
-        sf.write(input_path, audio, sr)
+    log.info(f"  Validation message: {msg}")
 
-        # Test command building
-        cmd, analysis = build_ffmpeg_command(input_path, output_path)
+    is_valid, msg = validate_pcm_output(pcm[:500])
+    assert_true(
+        not is_valid and "too small" in msg,
+        "Truncated output fails validation",
+        f"Should have failed but got: {msg}"
+    )
 
-        assert_true(
-            cmd is not None and len(cmd) > 0,
-            "FFmpeg command is generated",
-            f"Got command: {cmd}"
-        )
+    is_valid, msg = validate_pcm_output(pcm, expected_duration_sec=10.0)
+    assert_true(
+        not is_valid and "Duration mismatch" in msg,
+        "Duration mismatch is detected",
+        f"Should have failed but got: {msg}"
+    )
 
-        assert_true(
-            'ffmpeg' in cmd[0],
-            "Command starts with ffmpeg",
-            f"First element: {cmd[0]}"
-        )
+    is_valid, msg = validate_pcm_output(bytes(len(pcm)))
+    assert_true(
+        not is_valid and "silent" in msg,
+        "Silent output fails validation",
+        f"Should have failed but got: {msg}"
+    )
 
-        assert_true(
-            '-filter:a' in cmd,
-            "Command includes audio filter parameter",
-            f"Command: {cmd}"
-        )
+    # Tolerance is 15% of the expected duration, but never under 0.5s
+    assert_true(
+        _check_duration(1.4, 1.0) is None and _check_duration(1.6, 1.0) is not None,
+        "Short calls get the 0.5s minimum duration tolerance",
+        f"1.4s: {_check_duration(1.4, 1.0)}, 1.6s: {_check_duration(1.6, 1.0)}"
+    )
 
-        assert_true(
-            analysis is not None,
-            "Audio analysis is returned with command",
-            f"Analysis: {analysis}"
-        )
+    assert_true(
+        _check_duration(11.4, 10.0) is None and _check_duration(11.6, 10.0) is not None,
+        "Long calls get a 15% duration tolerance",
+        f"11.4s: {_check_duration(11.4, 10.0)}, 11.6s: {_check_duration(11.6, 10.0)}"
+    )
 
-        log.info(f"  Generated command: {' '.join(cmd[:5])}...")
-        log.info(f"  Filter chain includes {len(cmd[cmd.index('-filter:a') + 1].split(','))} filters")
+    assert_true(
+        _check_duration(5.0, None) is None and _check_duration(5.0, 0) is None,
+        "Unknown expected duration skips the duration check",
+        "Expected no mismatch without an expected duration"
+    )
+
+    is_valid, msg = _check_amplitude(np.array([], dtype=np.float32))
+    assert_true(
+        not is_valid,
+        "Output with no samples fails the amplitude check",
+        f"Should have failed but got: {msg}"
+    )
 
-    finally:
-        if os.path.exists(input_path):
-            os.unlink(input_path)
+    is_valid, msg = _check_amplitude(np.ones(1000, dtype=np.float32))
+    assert_true(
+        is_valid,
+        "Clipped output is only warned about, not rejected",
+        f"Validation failed: {msg}"
+    )
 
 
-def test_output_validation():
-    """Test WAV output validation."""
+def test_target_wav_detection():
+    """Test detection of inputs that are already 16-bit mono WAV at AUDIO_SR."""
     log.info("\n" + "="*60)
-    log.info("TEST SUITE: Output Validation")
+    log.info("TEST SUITE: Target WAV Detection")
     log.info("="*60)
 
-    # Create a valid test WAV
-    sr = 16000
-    duration = 1.0
-    t = np.linspace(0, duration, int(sr * duration))
-    audio = 0.5 * np.sin(2 * np.pi * 1000 * t)
+    y = sine(0.1)
+
+    assert_true(
+        _is_target_wav(io.BytesIO(wav_bytes(y))),
+        f"16-bit mono {AUDIO_SR}Hz WAV is recognised",
+        "Target WAV was not detected"
+    )
+
+    assert_true(
+        not _is_target_wav(io.BytesIO(wav_bytes(y, sr=44100))),
+        "WAV at another sample rate is converted",
+        "44.1kHz WAV was treated as target format"
+    )
 
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-        wav_path = f.name
+    assert_true(
+        not _is_target_wav(io.BytesIO(wav_bytes(y, channels=2))),
+        "Stereo WAV is converted",
+        "Stereo WAV was treated as target format"
+    )
 
+    assert_true(
+        not _is_target_wav(io.BytesIO(b"\x00\x00\x00\x20ftypM4A " + bytes(64))),
+        "Non-WAV input (M4A) is converted",
+        "M4A header was treated as target format"
+    )
+
+
+def test_decode_spool_retry():
+    """Test the decode step, including the temp-file retry for non-faststart M4A."""
+    log.info("\n" + "="*60)
+    log.info("TEST SUITE: Decode (pipe + M4A spool retry)")
+    log.info("="*60)
+
+    audio_bytes = b"\x00\x00\x00\x20ftypM4A " + os.urandom(256)
+    decoded = to_f32le(sine(0.5))
+
+    fake = FakeFFmpeg(decoded_pcm=decoded)
+    pcm = run_with_ffmpeg(fake, lambda: _decode_pcm(audio_bytes, 60))
+    assert_true(
+        pcm == decoded and len(fake.calls) == 1 and fake.calls[0][1] == audio_bytes,
+        "Pipeable input is decoded once from stdin",
+        f"FFmpeg calls: {len(fake.calls)}"
+    )
+
+    fake = FakeFFmpeg(decoded_pcm=decoded, pipe_decode_error=b"moov atom not found")
+    pcm = run_with_ffmpeg(fake, lambda: _decode_pcm(audio_bytes, 60))
+    assert_true(
+        pcm == decoded and len(fake.calls) == 2,
+        "Failed pipe decode is retried from a temp file",
+        f"FFmpeg calls: {len(fake.calls)}"
+    )
+
+    assert_true(
+        fake.calls[1][1] is None and fake.spooled == [audio_bytes],
+        "Retry reads the complete download from disk, not stdin",
+        f"stdin: {fake.calls[1][1]!r}, spooled: {[len(s) for s in fake.spooled]}"
+    )
+
+    fake = FakeFFmpeg(pipe_decode_error=b"moov atom not found", file_decode_error=b"Invalid data")
     try:
-        import soundfile as sf
-        sf.write(wav_path, audio, sr)
+        run_with_ffmpeg(fake, lambda: _decode_pcm(audio_bytes, 60))
+        error = None
+    except Exception as e:
+        error = str(e)
+    assert_true(
+        error is not None and "FFmpeg error: Invalid data" in error,
+        "Undecodable input raises after the retry",
+        f"Got: {error}"
+    )
 
-        # Test validation
-        is_valid, msg = validate_wav_output(wav_path, expected_duration_sec=duration)
 
-        assert_true(
-            is_valid,
-            "Valid WAV passes validation",
-            f"Validation failed: {msg}"
-        )
+def test_transcode_audio_async():
+    """Test the in-memory conversion used by ingest, with FFmpeg stubbed out."""
+    log.info("\n" + "="*60)
+    log.info("TEST SUITE: transcode_audio_async")
+    log.info("="*60)
 
-        log.info(f"  Validation message: {msg}")
+    audio_bytes = b"\x00\x00\x00\x20ftypM4A " + os.urandom(1024)  # Under the analysis cutoff
+    y = sine(1.0)
+    fake = FakeFFmpeg(decoded_pcm=to_f32le(y), filtered_pcm=to_s16le(y))
 
-        # Test invalid file
-        is_valid_invalid, msg_invalid = validate_wav_output("/nonexistent/file.wav")
-        assert_true(
-            not is_valid_invalid,
-            "Nonexistent file fails validation",
-            f"Should have failed but got: {msg_invalid}"
-        )
+    wav_file = run_with_ffmpeg(fake, lambda: transcode_audio_async(audio_bytes))
+    with wave.open(wav_file, "rb") as w:
+        params = (w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes())
+    assert_true(
+        params == (1, 2, AUDIO_SR, len(y)),
+        f"Output is a 16-bit mono {AUDIO_SR}Hz WAV of the filtered PCM",
+        f"WAV params: {params}"
+    )
 
-        # Test duration mismatch
-        is_valid_duration, msg_duration = validate_wav_output(wav_path, expected_duration_sec=10.0)
-        assert_true(
-            not is_valid_duration,
-            "Duration mismatch is detected",
-            f"Should have failed but got: {msg_duration}"
-        )
+    filter_cmd, filter_input, filter_timeout = fake.calls[-1]
+    assert_true(
+        len(fake.calls) == 2 and filter_input == to_f32le(y),
+        "Decoded PCM is filtered in a second pass without re-decoding",
+        f"FFmpeg calls: {len(fake.calls)}"
+    )
 
-    finally:
-        if os.path.exists(wav_path):
-            os.unlink(wav_path)
+    assert_true(
+        filter_cmd[filter_cmd.index('-filter:a') + 1] == TIER2_CHAIN and filter_timeout == 60,
+        "Short input uses tier 2 and the 60s minimum timeout",
+        f"Chain: {filter_cmd[filter_cmd.index('-filter:a') + 1]!r}, timeout: {filter_timeout}"
+    )
+
+    # Input already in the target format is passed through untouched
+    target = wav_bytes(y)
+    fake = FakeFFmpeg()
+    wav_file = run_with_ffmpeg(fake, lambda: transcode_audio_async(target))
+    assert_true(
+        wav_file.getvalue() == target and not fake.calls,
+        "Target-format WAV skips both FFmpeg passes",
+        f"FFmpeg calls: {len(fake.calls)}"
+    )
+
+    # Filtered output that fails validation is rejected
+    fake = FakeFFmpeg(decoded_pcm=to_f32le(y), filtered_pcm=to_s16le(np.zeros_like(y)))
+    try:
+        run_with_ffmpeg(fake, lambda: transcode_audio_async(audio_bytes))
+        error = None
+    except Exception as e:
+        error = str(e)
+    assert_true(
+        error is not None and "Output validation failed" in error,
+        "Silent filter output is rejected",
+        f"Got: {error}"
+    )
+
+    fake = FakeFFmpeg(decoded_pcm=to_f32le(y), filter_error=b"No such filter")
+    try:
+        run_with_ffmpeg(fake, lambda: transcode_audio_async(audio_bytes))
+        error = None
+    except Exception as e:
+        error = str(e)
+    assert_true(
+        error is not None and "FFmpeg error: No such filter" in error,
+        "Filter pass failure raises",
+        f"Got: {error}"
+    )
 
 
 def test_performance():
@@ -299,38 +560,23 @@ def test_performance():
     log.info("TEST SUITE: Performance")
     log.info("="*60)
 
-    # Create test audio
-    sr = 16000
+    # More realistic audio with noise
     duration = 2.0
-    t = np.linspace(0, duration, int(sr * duration))
-    # Create more realistic audio with noise
-    audio = 0.5 * np.sin(2 * np.pi * 1000 * t) + 0.1 * np.random.randn(len(t))
-    audio = np.clip(audio, -1, 1)  # Prevent clipping
-
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-        wav_path = f.name
-
-    try:
-        import soundfile as sf
-        sf.write(wav_path, audio, sr)
+    y = sine(duration, noise=0.1)
 
-        # Time analysis
-        start = time.time()
-        analysis = analyze_audio_enhanced(wav_path)
-        analysis_time = time.time() - start
+    # Time analysis
+    start = time.time()
+    analyze_pcm(y, AUDIO_SR)
+    analysis_time = time.time() - start
 
-        assert_true(
-            analysis_time < 2.0,
-            f"Audio analysis completes in < 2 seconds ({analysis_time:.2f}s)",
-            f"Analysis took {analysis_time:.2f}s"
-        )
-
-        log.info(f"  Analysis time: {analysis_time:.3f}s for {duration}s audio")
-        log.info(f"  Performance ratio: {(analysis_time / duration):.2f}x real-time")
+    assert_true(
+        analysis_time < 2.0,
+        f"Audio analysis completes in < 2 seconds ({analysis_time:.2f}s)",
+        f"Analysis took {analysis_time:.2f}s"
+    )
 
-    finally:
-        if os.path.exists(wav_path):
-            os.unlink(wav_path)
+    log.info(f"  Analysis time: {analysis_time:.3f}s for {duration}s audio")
+    log.info(f"  Performance ratio: {(analysis_time / duration):.2f}x real-time")
 
 
 def print_summary():
@@ -362,19 +608,28 @@ def main():
     """Run all tests."""
     log.info("Starting audio conversion test suite...")
 
-    try:
-        test_audio_analysis()
-        test_tier_selection()
-        test_ffmpeg_command_building()
-        test_output_validation()
-        test_performance()
-
-        success = print_summary()
-        return 0 if success else 1
-
-    except Exception as e:
-        log.exception(f"Test suite failed with exception: {e}")
-        return 1
+    suites = [
+        test_audio_analysis,
+        test_tier_selection,
+        test_ffmpeg_command_building,
+        test_output_validation,
+        test_target_wav_detection,
+        test_decode_spool_retry,
+        test_transcode_audio_async,
+        test_performance,
+    ]
+
+    for suite in suites:
+        try:
+            suite()
+        except AssertionError:
+            pass  # Already recorded; run the remaining suites
+        except Exception as e:
+            log.exception(f"Test suite failed with exception: {e}")
+            return 1
+
+    success = print_summary()
+    return 0 if success else 1
 
 
 if __name__ == "__main__":
@@ -10,6 +10,9 @@ Tests:
 3. test_update_processed_status - Verify UPDATE affects exactly 1 row
 4. test_concurrent_worker_locking - Verify FOR UPDATE SKIP LOCKED works
 5. test_schema_columns_exist - Verify required columns exist
+
+The test_insert_calls_batch_* functions run insert_calls_batch() against a
+fake connection; they need no database and run under pytest.
 """
 
 import asyncio
@@ -17,12 +20,18 @@ import json
 import uuid
 import os
 import sys
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
-# Add shared modules to path
+import pytest
+
+# Add shared modules to path (container layout, then a repo checkout)
 sys.path.insert(0, '/app/shared_bcfy')
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared_bcfy'
+))
 
-from db_pool import get_connection, release_connection
+from db_pool import acquire
 
 # Test configuration
 TEST_PREFIX = "TEST_"  # Prefix for test call_uids to identify cleanup targets
@@ -40,8 +49,7 @@ async def cleanup_test_data(conn):
 
 async def test_insert_new_call():
     """Test: New call is inserted successfully and returns 'inserted' status."""
-    conn = await get_connection()
-    try:
+    async with acquire() as conn:
         await cleanup_test_data(conn)
 
         # Generate unique test call
@@ -96,14 +104,10 @@ async def test_insert_new_call():
         # Cleanup
         await conn.execute("DELETE FROM bcfy_calls_raw WHERE call_uid = $1", test_call_uid)
 
-    finally:
-        await release_connection(conn)
-
 
 async def test_duplicate_call_handling():
     """Test: Duplicate call_uid returns None (duplicate detected)."""
-    conn = await get_connection()
-    try:
+    async with acquire() as conn:
         await cleanup_test_data(conn)
 
         # Generate unique test call
@@ -135,14 +139,10 @@ async def test_duplicate_call_handling():
         # Cleanup
         await conn.execute("DELETE FROM bcfy_calls_raw WHERE call_uid = $1", test_call_uid)
 
-    finally:
-        await release_connection(conn)
-
 
 async def test_update_processed_status():
     """Test: UPDATE sets processed=TRUE and affects exactly 1 row."""
-    conn = await get_connection()
-    try:
+    async with acquire() as conn:
         await cleanup_test_data(conn)
 
         # Insert test call (group_id is text)
@@ -177,9 +177,6 @@ async def test_update_processed_status():
         # Cleanup
         await conn.execute("DELETE FROM bcfy_calls_raw WHERE call_uid = $1", test_call_uid)
 
-    finally:
-        await release_connection(conn)
-
 
 async def test_concurrent_worker_locking():
     """Test: FOR UPDATE SKIP LOCKED prevents duplicate processing.
@@ -187,9 +184,7 @@ async def test_concurrent_worker_locking():
     This test simulates two concurrent workers trying to select the same unprocessed call.
     With FOR UPDATE SKIP LOCKED, only one should get the row.
     """
-    conn1 = await get_connection()
-    conn2 = await get_connection()
-    try:
+    async with acquire() as conn1, acquire() as conn2:
         await cleanup_test_data(conn1)
 
         # Insert test call (group_id is text)
@@ -239,15 +234,10 @@ async def test_concurrent_worker_locking():
         # Cleanup
         await conn1.execute("DELETE FROM bcfy_calls_raw WHERE call_uid = $1", test_call_uid)
 
-    finally:
-        await release_connection(conn1)
-        await release_connection(conn2)
-
 
 async def test_schema_columns_exist():
     """Test: Required columns from migration 005 exist."""
-    conn = await get_connection()
-    try:
+    async with acquire() as conn:
         result = await conn.fetch("""
             SELECT column_name FROM information_schema.columns
             WHERE table_name = 'bcfy_calls_raw'
@@ -258,9 +248,6 @@ async def test_schema_columns_exist():
         assert 'playlist_uuid' in columns, "Missing column: playlist_uuid"
         assert 's3_key_v2' in columns, "Missing column: s3_key_v2"
 
-    finally:
-        await release_connection(conn)
-
 
 async def run_all_tests():
     """Run all database write tests."""
@@ -301,6 +288,136 @@ async def run_all_tests():
     return failed == 0
 
 
+# =========================================================
+# insert_calls_batch() unit tests (pytest, no database)
+# =========================================================
+def _get_calls():
+    """Import get_calls, skipping when its runtime dependencies are missing."""
+    return pytest.importorskip("get_calls")
+
+
+class _BatchInsertStmt:
+    """Fake unnest INSERT: ON CONFLICT(call_uid) DO NOTHING RETURNING playlist_uuid."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def fetch(self, *columns):
+        self.conn.batches.append(columns)
+        if self.conn.fail_batch:
+            raise ValueError("invalid input for query argument")
+        returned = []
+        for row in zip(*columns, strict=True):
+            call_uid, playlist_uuid = row[0], row[-1]
+            if call_uid not in self.conn.existing:
+                self.conn.existing.add(call_uid)
+                returned.append({'playlist_uuid': playlist_uuid})
+        return returned
+
+
+class _BatchConn:
+    """Fake connection holding the call_uids already in bcfy_calls_raw."""
+
+    def __init__(self, existing=(), fail_batch=False):
+        self.existing = set(existing)
+        self.fail_batch = fail_batch
+        self.batches = []
+
+    async def prepare(self, _sql):
+        return _BatchInsertStmt(self)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+def _call(group_id, ts, **extra):
+    return {'groupId': group_id, 'ts': ts, 'duration': 2.5, **extra}
+
+
+def test_insert_calls_batch_counts_per_playlist():
+    """One round trip; inserted vs duplicate counts are split by playlist."""
+    gc = _get_calls()
+    pl_a, pl_b = uuid.uuid4(), uuid.uuid4()
+    conn = _BatchConn(existing={'10-1700000001'})
+
+    counts = asyncio.run(gc.insert_calls_batch(conn, [
+        (pl_a, [_call(10, 1700000002), _call(10, 1700000001)]),
+        (pl_b, [_call(20, 1700000003)]),
+    ]))
+
+    assert counts == {
+        pl_a: {'inserted': 1, 'duplicates': 1, 'errors': 0},
+        pl_b: {'inserted': 1, 'duplicates': 0, 'errors': 0},
+    }
+    assert len(conn.batches) == 1
+    call_uids = list(conn.batches[0][0])
+    assert call_uids == sorted(call_uids)  # Inserted in call_uid order
+
+
+def test_insert_calls_batch_counts_duplicates_within_batch():
+    """A call repeated inside one batch is inserted once and counted as a duplicate."""
+    gc = _get_calls()
+    pl = uuid.uuid4()
+    conn = _BatchConn()
+
+    counts = asyncio.run(gc.insert_calls_batch(conn, [
+        (pl, [_call(10, 1700000001), _call(10, 1700000001), _call(10, 1700000002)]),
+    ]))
+
+    assert counts[pl] == {'inserted': 2, 'duplicates': 1, 'errors': 0}
+
+
+def test_insert_calls_batch_skips_malformed_calls():
+    """Calls without groupId/ts are counted as errors and never reach the INSERT."""
+    gc = _get_calls()
+    pl = uuid.uuid4()
+    conn = _BatchConn()
+
+    counts = asyncio.run(gc.insert_calls_batch(conn, [
+        (pl, [_call(10, 1700000001), {'ts': 1700000002}]),
+    ]))
+
+    assert counts[pl] == {'inserted': 1, 'duplicates': 0, 'errors': 1}
+    assert list(conn.batches[0][0]) == ['10-1700000001']
+
+    # Nothing valid: no INSERT is issued at all
+    conn = _BatchConn()
+    counts = asyncio.run(gc.insert_calls_batch(conn, [(pl, [{'groupId': 10}])]))
+    assert counts[pl] == {'inserted': 0, 'duplicates': 0, 'errors': 1}
+    assert conn.batches == []
+
+
+def test_insert_calls_batch_falls_back_to_per_call_inserts(monkeypatch):
+    """A rejected batch is retried call by call via quick_insert_call_metadata."""
+    gc = _get_calls()
+    pl_a, pl_b = uuid.uuid4(), uuid.uuid4()
+    conn = _BatchConn(fail_batch=True)
+    statuses = {'10-1700000001': 'inserted', '10-1700000002': 'duplicate', '20-1700000003': 'error'}
+    retried = []
+
+    async def fake_quick_insert(_conn, playlist_uuid, call):
+        call_uid = f"{call['groupId']}-{call['ts']}"
+        retried.append((playlist_uuid, call_uid))
+        return {'status': statuses[call_uid], 'call_uid': call_uid, 'error': None}
+
+    monkeypatch.setattr(gc, "quick_insert_call_metadata", fake_quick_insert)
+
+    counts = asyncio.run(gc.insert_calls_batch(conn, [
+        (pl_a, [_call(10, 1700000001), _call(10, 1700000002), {'groupId': 10}]),
+        (pl_b, [_call(20, 1700000003)]),
+    ]))
+
+    assert len(conn.batches) == 1
+    assert retried == [
+        (pl_a, '10-1700000001'), (pl_a, '10-1700000002'), (pl_b, '20-1700000003'),
+    ]
+    assert counts == {
+        pl_a: {'inserted': 1, 'duplicates': 1, 'errors': 1},
+        pl_b: {'inserted': 0, 'duplicates': 0, 'errors': 1},
+    }
+
+
 if __name__ == "__main__":
     success = asyncio.run(run_all_tests())
     sys.exit(0 if success else 1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Unit tests for db_pool singleton creation.
+
+No database required: asyncpg.create_pool is replaced with a slow fake so
+concurrent first-time callers race on pool creation.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add app_scheduler directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("asyncpg")
+
+import db_pool  # noqa: E402
+
+
+def test_concurrent_get_pool_creates_single_pool(monkeypatch):
+    """50 concurrent get_pool() calls must share one pool and create it once."""
+    created = []
+    pool_kwargs = []
+
+    async def fake_create_pool(**kwargs):
+        await asyncio.sleep(0.01)  # Yield so every caller reaches the creation path
+        pool = object()
+        created.append(pool)
+        pool_kwargs.append(kwargs)
+        return pool
+
+    monkeypatch.setattr(db_pool.asyncpg, "create_pool", fake_create_pool)
+    for var in ("PG_MIN_POOL", "PG_MAX_POOL", "PG_MAX_INACTIVE_SEC"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(db_pool, "_pool", None)
+    monkeypatch.setattr(db_pool, "_pool_lock", None)
+
+    async def run():
+        tasks = [asyncio.create_task(db_pool.get_pool()) for _ in range(50)]
+        return await asyncio.gather(*tasks)
+
+    pools = asyncio.run(run())
+
+    assert len({id(p) for p in pools}) == 1
+    assert len(created) == 1
+
+    # Pool sizing, idle lifetime and the per-connection codec hook
+    kwargs = pool_kwargs[0]
+    assert kwargs["min_size"] == 5
+    assert kwargs["max_size"] == 25
+    assert kwargs["max_inactive_connection_lifetime"] == 300.0
+    assert kwargs["init"] is db_pool._init_connection
+
+
+def test_init_connection_registers_binary_jsonb_codec():
+    """Every pooled connection gets the orjson jsonb codec in binary format."""
+    codecs = []
+
+    class FakeConn:
+        async def set_type_codec(self, typename, **kwargs):
+            codecs.append((typename, kwargs))
+
+    asyncio.run(db_pool._init_connection(FakeConn()))
+
+    assert codecs == [("jsonb", {
+        "schema": "pg_catalog", "format": "binary",
+        "encoder": db_pool._encode_jsonb, "decoder": db_pool._decode_jsonb,
+    })]
+
+
+def test_jsonb_codec_serializes_objects_and_passes_strings_through():
+    """Dicts are encoded by orjson; str values are taken as already-serialized JSON."""
+    assert db_pool._encode_jsonb({"a": 1}) == b'\x01{"a":1}'
+    assert db_pool._encode_jsonb('{"a": 1}') == b'\x01{"a": 1}'
+    assert db_pool._decode_jsonb(b'\x01{"a":1}') == '{"a":1}'
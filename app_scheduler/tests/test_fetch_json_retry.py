@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Unit tests for get_calls.fetch_json() throttling retries.
+
+No network required: _fetch_json_once is replaced with a fake that raises
+_ThrottledError, and asyncio.sleep is recorded instead of awaited.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add app_scheduler and shared modules to path for imports
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _APP_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(_APP_DIR), "shared_bcfy"))
+
+get_calls = pytest.importorskip("get_calls")
+
+
+def test_retry_delay_prefers_numeric_retry_after():
+    """A numeric Retry-After header is used as-is, capped at MAX_RETRY_DELAY_SEC."""
+    assert get_calls._retry_delay(0, "7") == 7.0
+    assert get_calls._retry_delay(3, "0.5") == 0.5
+    assert get_calls._retry_delay(0, "3600") == get_calls.MAX_RETRY_DELAY_SEC
+
+
+def test_retry_delay_falls_back_to_exponential_backoff():
+    """Missing or HTTP-date Retry-After values back off as 2**attempt, capped."""
+    assert get_calls._retry_delay(0, None) == 1
+    assert get_calls._retry_delay(3, None) == 8
+    assert get_calls._retry_delay(2, "Wed, 21 Oct 2015 07:28:00 GMT") == 4
+    assert get_calls._retry_delay(10, None) == get_calls.MAX_RETRY_DELAY_SEC
+
+
+def _patch_fetch(monkeypatch, failures, retry_after=None):
+    """Make _fetch_json_once throttle `failures` times, then succeed; return call log and sleeps."""
+    calls = []
+    sleeps = []
+
+    async def fake_fetch_json_once(*_args):
+        calls.append(1)
+        if len(calls) <= failures:
+            raise get_calls._ThrottledError("HTTP 429", retry_after)
+        return {"ok": True}
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(get_calls, "_fetch_json_once", fake_fetch_json_once)
+    monkeypatch.setattr(get_calls.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(get_calls, "_api_semaphore", None)
+    monkeypatch.setattr(get_calls, "BCFY_API_MAX_RETRIES", 3)
+    return calls, sleeps
+
+
+def test_fetch_json_retries_throttled_requests(monkeypatch):
+    """429/503 responses are retried with backoff until a request succeeds."""
+    calls, sleeps = _patch_fetch(monkeypatch, failures=2)
+
+    result = asyncio.run(get_calls.fetch_json(None, "http://api/live/", "token"))
+
+    assert result == {"ok": True}
+    assert len(calls) == 3
+    assert sleeps == [1, 2]
+
+
+def test_fetch_json_honours_retry_after(monkeypatch):
+    """The server's Retry-After replaces the exponential delay."""
+    _, sleeps = _patch_fetch(monkeypatch, failures=1, retry_after="5")
+
+    asyncio.run(get_calls.fetch_json(None, "http://api/live/", "token"))
+
+    assert sleeps == [5.0]
+
+
+def test_fetch_json_raises_after_last_attempt(monkeypatch):
+    """Once BCFY_API_MAX_RETRIES retries are spent the throttle error propagates."""
+    calls, sleeps = _patch_fetch(monkeypatch, failures=10)
+
+    with pytest.raises(get_calls._ThrottledError):
+        asyncio.run(get_calls.fetch_json(None, "http://api/live/", "token"))
+
+    assert len(calls) == 4  # First attempt + 3 retries
+    assert len(sleeps) == 3  # No sleep after the final attempt
@@ -18,6 +18,9 @@ Requirements:
     - At least one playlist with sync=TRUE
     - Database connection available
     - MinIO/S3 storage available
+
+The test_* functions cover the polling backoff and schema check without a
+database and run under pytest.
 """
 
 import asyncio
@@ -25,12 +28,18 @@ import json
 import os
 import sys
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
 
-# Add shared modules to path
+import pytest
+
+# Add shared modules to path (container layout, then a repo checkout)
 sys.path.insert(0, '/app/shared_bcfy')
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared_bcfy'
+))
 
-from db_pool import get_connection, release_connection
+from db_pool import acquire
 
 
 async def get_baseline_metrics(conn):
@@ -183,8 +192,7 @@ async def regression_test():
     print(f"Started: {datetime.now(timezone.utc).isoformat()}")
     print("=" * 70)
 
-    conn = await get_connection()
-    try:
+    async with acquire() as conn:
         # Step 1: Get baseline metrics
         print("\n[1/6] Getting baseline metrics...")
         baseline = await get_baseline_metrics(conn)
@@ -288,8 +296,91 @@ async def regression_test():
 
         return success
 
-    finally:
-        await release_connection(conn)
+
+# =========================================================
+# Unit tests (pytest, no database)
+# =========================================================
+def _get_calls():
+    """Import get_calls, skipping when its runtime dependencies are missing."""
+    return pytest.importorskip("get_calls")
+
+
+def test_next_poll_interval_backs_off_on_empty_polls():
+    """Empty polls start at the minimum, double, and stop at the maximum."""
+    gc = _get_calls()
+    lo, hi = gc.POLL_BACKOFF_MIN_SEC, gc.POLL_BACKOFF_MAX_SEC
+
+    assert gc.next_poll_interval(0, 0) == lo
+    assert gc.next_poll_interval(lo, 0) == min(lo * 2, hi)
+    assert gc.next_poll_interval(hi - 1, 0) == hi
+    assert gc.next_poll_interval(hi, 0) == hi
+
+
+def test_next_poll_interval_resets_when_calls_arrive():
+    """Any calls reset the interval so the playlist is polled every cycle again."""
+    gc = _get_calls()
+    assert gc.next_poll_interval(gc.POLL_BACKOFF_MAX_SEC, 3) == 0
+    assert gc.next_poll_interval(0, 1) == 0
+
+
+class _SchemaConn:
+    """Fake connection answering the information_schema query with fixed columns."""
+
+    def __init__(self, columns):
+        self.rows = [{'table_name': t, 'column_name': c} for t, c in columns]
+        self.queries = 0
+
+    async def fetch(self, _sql):
+        self.queries += 1
+        return self.rows
+
+
+def _patch_schema(monkeypatch, gc, columns):
+    conn = _SchemaConn(columns)
+
+    @asynccontextmanager
+    async def fake_acquire():
+        yield conn
+
+    monkeypatch.setattr(gc, "acquire", fake_acquire)
+    monkeypatch.setattr(gc, "_schema_verified", False)
+    return conn
+
+
+CALLS_COLUMNS = [('bcfy_calls_raw', 'playlist_uuid'), ('bcfy_calls_raw', 's3_key_v2')]
+POLLING_COLUMNS = [('bcfy_playlists', 'poll_interval_sec'), ('bcfy_playlists', 'next_poll_at')]
+
+
+def test_verify_schema_passes_once_and_is_cached(monkeypatch):
+    """With every column present the check passes and later calls skip the query."""
+    gc = _get_calls()
+    conn = _patch_schema(monkeypatch, gc, CALLS_COLUMNS + POLLING_COLUMNS)
+
+    asyncio.run(gc.verify_schema())
+    asyncio.run(gc.verify_schema())
+
+    assert conn.queries == 1
+
+
+def test_verify_schema_requires_polling_columns(monkeypatch):
+    """Missing bcfy_playlists polling columns point at migration 013."""
+    gc = _get_calls()
+    conn = _patch_schema(monkeypatch, gc, CALLS_COLUMNS)
+
+    with pytest.raises(RuntimeError, match="013_playlist_adaptive_polling"):
+        asyncio.run(gc.verify_schema())
+    with pytest.raises(RuntimeError):  # A failed check is not cached
+        asyncio.run(gc.verify_schema())
+    assert conn.queries == 2
+
+
+def test_verify_schema_requires_calls_columns(monkeypatch):
+    """Missing bcfy_calls_raw columns point at migration 005."""
+    gc = _get_calls()
+    _patch_schema(monkeypatch, gc, POLLING_COLUMNS)
+
+    with pytest.raises(RuntimeError, match="005_s3_hierarchical"):
+        asyncio.run(gc.verify_schema())
 
 
 if __name__ == "__main__":
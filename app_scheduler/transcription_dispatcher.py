@@ -13,7 +13,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
 from celery import Celery
-from db_pool import get_connection, release_connection
+from db_pool import acquire
 
 logging.basicConfig(
     level=logging.INFO,
@@ -97,63 +97,60 @@ async def dispatch_transcription_tasks() -> int:
     Queries pending transcriptions and queues Celery tasks.
     Returns the number of tasks queued.
     """
-    conn = await get_connection()
-    queued_count = 0
+    async with acquire() as conn:
+        queued_count = 0
 
-    try:
-        pending = await get_pending_transcriptions(conn, BATCH_SIZE, MAX_AGE_HOURS)
+        try:
+            pending = await get_pending_transcriptions(conn, BATCH_SIZE, MAX_AGE_HOURS)
 
-        if not pending:
-            log.debug("No pending transcriptions")
-            return 0
+            if not pending:
+                log.debug("No pending transcriptions")
+                return 0
+
+            log.info(f"Found {len(pending)} calls pending transcription")
+
+            for call in pending:
+                call_uid = call['call_uid']
+                s3_key = call['s3_key_v2']
+
+                try:
+                    # Initialize processing_state if not exists
+                    await conn.execute("""
+                        INSERT INTO processing_state (call_uid, status, updated_at)
+                        VALUES ($1, 'queued', NOW())
+                        ON CONFLICT (call_uid) DO UPDATE SET
+                            status = 'queued',
+                            updated_at = NOW()
+                    """, call_uid)
+
+                    # Queue the task
+                    task_id = await queue_transcription_task(call_uid, s3_key)
+                    queued_count += 1
 
-        log.info(f"Found {len(pending)} calls pending transcription")
+                    log.info(f"Queued transcription for {call_uid} (task: {task_id})")
 
-        for call in pending:
-            call_uid = call['call_uid']
-            s3_key = call['s3_key_v2']
+                    # Rate limiting
+                    await asyncio.sleep(RATE_LIMIT_DELAY)
 
-            try:
-                # Initialize processing_state if not exists
+                except Exception as e:
+                    log.error(f"Failed to queue {call_uid}: {e}")
+                    continue
+
+            # Log batch completion
+            if queued_count > 0:
                 await conn.execute("""
-                    INSERT INTO processing_state (call_uid, status, updated_at)
-                    VALUES ($1, 'queued', NOW())
-                    ON CONFLICT (call_uid) DO UPDATE SET
-                        status = 'queued',
-                        updated_at = NOW()
-                """, call_uid)
-
-                # Queue the task
-                task_id = await queue_transcription_task(call_uid, s3_key)
-                queued_count += 1
-
-                log.info(f"Queued transcription for {call_uid} (task: {task_id})")
-
-                # Rate limiting
-                await asyncio.sleep(RATE_LIMIT_DELAY)
-
-            except Exception as e:
-                log.error(f"Failed to queue {call_uid}: {e}")
-                continue
-
-        # Log batch completion
-        if queued_count > 0:
-            await conn.execute("""
-                INSERT INTO system_logs (component, event_type, message, metadata)
-                VALUES ($1, $2, $3, $4::jsonb)
-            """, 'transcription_dispatcher', 'batch_queued',
-                f"Queued {queued_count}/{len(pending)} transcription tasks",
-                f'{{"queued": {queued_count}, "total": {len(pending)}}}')
-
-        log.info(f"Queued {queued_count} transcription tasks")
-        return queued_count
-
-    except Exception as e:
-        log.exception(f"Dispatcher error: {e}")
-        return 0
-
-    finally:
-        await release_connection(conn)
+                    INSERT INTO system_logs (component, event_type, message, metadata)
+                    VALUES ($1, $2, $3, $4::jsonb)
+                """, 'transcription_dispatcher', 'batch_queued',
+                    f"Queued {queued_count}/{len(pending)} transcription tasks",
+                    f'{{"queued": {queued_count}, "total": {len(pending)}}}')
+
+            log.info(f"Queued {queued_count} transcription tasks")
+            return queued_count
+
+        except Exception as e:
+            log.exception(f"Dispatcher error: {e}")
+            return 0
 
 
 if __name__ == "__main__":
@@ -8,6 +8,8 @@
 --   - Migration 005: S3 hierarchical storage (playlist_uuid, s3_key_v2)
 --   - Migration 006: Transcription improvements (retry logic)
 --   - Migration 001: Monitoring schema and views (consolidated)
+--   - Migration 013: Adaptive playlist polling (poll_interval_sec, next_poll_at)
+--   - Migration 014: Partial index for errored calls (bcfy_calls_raw_error_attempt_idx)
 --
 -- NOT APPLIED (staged for future):
 --   - Migration 002: Table partitioning (monthly/weekly/daily)
@@ -93,6 +95,8 @@ CREATE TABLE IF NOT EXISTS bcfy_playlists (
     ts             BIGINT,
     last_seen      BIGINT,
     last_pos       BIGINT DEFAULT 0 NOT NULL,
+    poll_interval_sec INTEGER DEFAULT 0 NOT NULL,
+    next_poll_at   TIMESTAMPTZ,
     listeners      INTEGER,
     public         BOOLEAN DEFAULT TRUE,
     max_groups     INTEGER,
@@ -108,6 +112,8 @@ CREATE INDEX IF NOT EXISTS bcfy_playlists_listeners_idx  ON bcfy_playlists(liste
 CREATE INDEX IF NOT EXISTS bcfy_playlists_sync_idx ON bcfy_playlists(sync) WHERE sync = TRUE;
 
 COMMENT ON COLUMN bcfy_playlists.last_pos IS 'Unix timestamp from lastPos attribute in Live API response';
+COMMENT ON COLUMN bcfy_playlists.poll_interval_sec IS 'Current adaptive poll backoff in seconds (0 = poll every ingestion cycle)';
+COMMENT ON COLUMN bcfy_playlists.next_poll_at IS 'Ingestion skips this playlist until this time (NULL = due now)';
 
 CREATE TABLE IF NOT EXISTS bcfy_playlist_poll_log (
     uuid            UUID NOT NULL,
@@ -160,6 +166,12 @@ CREATE INDEX IF NOT EXISTS bcfy_calls_raw_playlist_uuid_idx ON bcfy_calls_raw(pl
 CREATE INDEX IF NOT EXISTS bcfy_calls_raw_playlist_time_idx ON bcfy_calls_raw(playlist_uuid, started_at DESC) WHERE playlist_uuid IS NOT NULL;
 CREATE INDEX IF NOT EXISTS bcfy_calls_raw_s3_key_v2_idx ON bcfy_calls_raw(s3_key_v2) WHERE s3_key_v2 IS NOT NULL;
 CREATE INDEX IF NOT EXISTS bcfy_calls_raw_pending_transcription_idx ON bcfy_calls_raw(started_at DESC) WHERE processed = TRUE AND s3_key_v2 IS NOT NULL AND error IS NULL;
+-- Time-window scans (monitoring throughput, recent-activity checks); also created by migration 001
+CREATE INDEX IF NOT EXISTS bcfy_calls_raw_fetched_at_idx ON bcfy_calls_raw(fetched_at DESC);
+-- Audio work queue (audio_worker batch pick, stuck-call and queue-depth checks); also created by migration 001
+CREATE INDEX IF NOT EXISTS bcfy_calls_raw_pending_idx ON bcfy_calls_raw(fetched_at) WHERE processed = FALSE AND error IS NULL;
+-- Error-pattern monitoring window (migration 014)
+CREATE INDEX IF NOT EXISTS bcfy_calls_raw_error_attempt_idx ON bcfy_calls_raw(last_attempt DESC) WHERE error IS NOT NULL;
 
 COMMENT ON TABLE bcfy_calls_raw IS 'Raw call metadata queue from Broadcastify Calls endpoint.';
 COMMENT ON COLUMN bcfy_calls_raw.playlist_uuid IS 'Playlist UUID captured at insert time for hierarchical S3 path construction';
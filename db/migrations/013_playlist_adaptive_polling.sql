@@ -0,0 +1,53 @@
+-- ============================================================
+-- Migration 013: Adaptive Per-Playlist Polling
+-- ============================================================
+--
+-- Purpose: Let quiet playlists back off instead of being polled
+--          every ingestion cycle
+--
+-- Changes:
+--   1. Add poll_interval_sec to bcfy_playlists (current backoff)
+--   2. Add next_poll_at to bcfy_playlists (skip until this time)
+--
+-- Behavior (app_scheduler/get_calls.py):
+--   - A poll that returns calls resets poll_interval_sec to 0
+--     (polled every cycle)
+--   - An empty poll doubles it, from POLL_BACKOFF_MIN_SEC up to
+--     POLL_BACKOFF_MAX_SEC
+--   - ingest_loop only polls rows with next_poll_at NULL or past
+--
+-- Risk: LOW - nullable/defaulted columns only; existing rows are
+--       polled every cycle until their first backoff
+--
+-- Dependencies:
+--   - bcfy_playlists table (init.sql)
+--
+-- ============================================================
+
+BEGIN;
+
+-- ============================================================
+-- 1. Add polling columns to bcfy_playlists
+-- ============================================================
+
+ALTER TABLE bcfy_playlists
+ADD COLUMN IF NOT EXISTS poll_interval_sec INTEGER DEFAULT 0 NOT NULL;
+
+ALTER TABLE bcfy_playlists
+ADD COLUMN IF NOT EXISTS next_poll_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN bcfy_playlists.poll_interval_sec IS
+    'Current adaptive poll backoff in seconds (0 = poll every ingestion cycle)';
+
+COMMENT ON COLUMN bcfy_playlists.next_poll_at IS
+    'Ingestion skips this playlist until this time (NULL = due now)';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (if needed):
+-- ============================================================
+-- BEGIN;
+-- ALTER TABLE bcfy_playlists DROP COLUMN IF EXISTS next_poll_at;
+-- ALTER TABLE bcfy_playlists DROP COLUMN IF EXISTS poll_interval_sec;
+-- COMMIT;
@@ -0,0 +1,43 @@
+-- ============================================================
+-- Migration 014: Partial Index for Errored Calls
+-- ============================================================
+--
+-- Purpose: Let the error-pattern monitor read only errored calls
+--          instead of scanning bcfy_calls_raw
+--
+-- Changes:
+--   1. Add bcfy_calls_raw_error_attempt_idx on last_attempt,
+--      restricted to rows with error IS NOT NULL
+--
+-- Behavior (app_scheduler/monitor_data_integrity.py):
+--   - check_error_patterns filters on error IS NOT NULL and a
+--     last_attempt window; both predicates are served by this index
+--   - The SUBSTRING(error FROM 1 FOR 100) grouping key is computed
+--     only for the (few) matching rows, so no stored column is added
+--
+-- Risk: LOW - index only; errored calls are a small fraction of the
+--       table, so the index is small and cheap to maintain
+--
+-- Dependencies:
+--   - bcfy_calls_raw table (init.sql)
+--
+-- ============================================================
+
+BEGIN;
+
+-- ============================================================
+-- 1. Partial index for the error-pattern window
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS bcfy_calls_raw_error_attempt_idx
+  ON bcfy_calls_raw(last_attempt DESC)
+  WHERE error IS NOT NULL;
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (if needed):
+-- ============================================================
+-- BEGIN;
+-- DROP INDEX IF EXISTS bcfy_calls_raw_error_attempt_idx;
+-- COMMIT;
@@ -1,29 +1,31 @@
-import os, time, json, base64, hmac, hashlib, logging
+import os, time, logging
+from functools import lru_cache
+import jwt
 
-def _b64url_encode(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+@lru_cache(maxsize=1)
+def _credentials():
+    """Read the API credentials once, with the signing key pre-encoded to bytes.
 
-def generate_jwt() -> str:
-    """Generate Broadcastify JWT using env vars."""
+    Resolved on first use rather than at import so callers can load .env first.
+    """
     api_key = os.getenv("BCFY_API_KEY")
     api_key_id = os.getenv("BCFY_API_KEY_ID")
     app_id = os.getenv("BCFY_APP_ID")
     if not all([api_key, api_key_id, app_id]):
         raise RuntimeError("Missing one of: BCFY_API_KEY, BCFY_API_KEY_ID, BCFY_APP_ID")
+    return api_key.encode(), api_key_id, app_id
+
+def generate_jwt() -> str:
+    """Generate Broadcastify JWT using env vars."""
+    api_key_bytes, api_key_id, app_id = _credentials()
 
-    header = {"alg": "HS256", "typ": "JWT", "kid": api_key_id}
     iat = int(time.time())
     exp = iat + 3600
     payload = {"iss": app_id, "iat": iat, "exp": exp}
 
-    enc_header = _b64url_encode(json.dumps(header, separators=(",", ":")).encode())
-    enc_payload = _b64url_encode(json.dumps(payload, separators=(",", ":")).encode())
-    signing_input = f"{enc_header}.{enc_payload}".encode()
-
-    sig = hmac.new(api_key.encode(), signing_input, hashlib.sha256).digest()
-    jwt_token = f"{enc_header}.{enc_payload}.{_b64url_encode(sig)}"
+    jwt_token = jwt.encode(payload, api_key_bytes, algorithm="HS256", headers={"kid": api_key_id})
 
     # Debug logging
-    logging.debug(f"Generated new JWT: {jwt_token[:50]}...")
-    logging.debug(f"API Key ID: {api_key_id}, App ID: {app_id}, IAT: {iat}, EXP: {exp}")
+    logging.debug("Generated new JWT: %s...", jwt_token[:50])
+    logging.debug("API Key ID: %s, App ID: %s, IAT: %s, EXP: %s", api_key_id, app_id, iat, exp)
     return jwt_token